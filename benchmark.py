@@ -0,0 +1,263 @@
+"""Break the Code Benchmarks.
+
+Time and measure the peak memory of the engine hot paths on seeded game scenarios, and compare the
+results with a baseline stored in JSON:
+
+    python benchmark.py --save-baseline     # record the baseline
+    python benchmark.py                     # fail if a result regressed past the threshold
+"""
+
+
+from typing import Callable, Dict, List, Tuple
+import argparse
+import copy
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+
+import engine.board as bd
+import engine.combination as cb
+import engine.session as ss
+import engine.simulations as sm
+import engine.states as bs
+import engine.tables as tb
+import engine.utils as ut
+
+
+# A benchmark setup returns a function preparing a fresh state, and the function to time on it
+Benchmark = Tuple[Callable[[], object], Callable[[object], object]]
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmark-baseline.json')
+
+STAGES = {'early': 0, 'mid': 2, 'late': 4}
+
+
+def deal(players: int, seed: int) -> Tuple[Tuple[int, ...], List[Tuple[int, ...]]]:
+    """Deal our tiles and the tiles of the opponents (the central tiles in a 2-player game)."""
+    rng = random.Random(seed)
+    tiles = list(range(20))
+    rng.shuffle(tiles)
+    positions = 5 if players < 4 else 4
+    hands = [cb.canonical_fcombination(tiles[i:i+positions]) for i in range(0, len(tiles), positions)]
+    if players == 2:
+        return hands[0], hands[1:2]
+    return hands[0], hands[1:players]
+
+
+def play_hints(players: int, seed: int, turns: int) -> Tuple[Tuple[int, ...], List[Tuple[str, List[Tuple[int, int | str | Tuple[str, ...]]]]]]:
+    """Return our tiles and the answers of the opponents to seeded random hints."""
+    fcombination, opponents = deal(players, seed)
+    rng = random.Random(seed)
+    hints = []
+    for _ in range(turns):
+        hint = rng.choice(list(ut.HINTS))
+        hints.append((hint, [(o, ut.HINTS[hint]['function'](f)) for o, f in enumerate(opponents)]))
+    return fcombination, hints
+
+
+def new_board(players: int, seed: int, turns: int) -> bd.Board:
+    """Return a board after the first seeded hints."""
+    fcombination, hints = play_hints(players, seed, turns)
+    board = bd.Board(fcombination, players)
+    for hint, answers in hints:
+        board.apply_hints(hint, answers)
+    return board
+
+
+def bench_board_init(players: int, seed: int) -> Benchmark:
+    """Build a new board."""
+    fcombination, _ = deal(players, seed)
+    return lambda: None, lambda _: bd.Board(fcombination, players)
+
+
+def bench_apply_hint(players: int, seed: int, stage: str) -> Benchmark:
+    """Apply the answers of the next hint on a board."""
+    _, hints = play_hints(players, seed, STAGES[stage] + 1)
+    board = new_board(players, seed, STAGES[stage])
+    hint, answers = hints[-1]
+
+    def run(board: bd.Board) -> None:
+        board.apply_hints(hint, answers)
+    return lambda: copy.deepcopy(board), run
+
+
+def bench_filter_known_tiles(players: int, seed: int, stage: str) -> Benchmark:
+    """Filter the central fcombinations with the known tiles of every opponent."""
+    board = new_board(players, seed, STAGES[stage])
+    return lambda: None, lambda _: [board._filter_known_tiles(board._central_mask, mask)
+                                    for mask in board._opponents_masks]
+
+
+def bench_simulate(players: int, seed: int, stage: str) -> Benchmark:
+    """Simulate every hint on a board."""
+    board = new_board(players, seed, STAGES[stage])
+    # Every run starts from a copy of the board without the simulations cached by the previous run
+    return lambda: board.with_masks(board.get_masks()), lambda board: [board.simulate(hint) for hint in ut.HINTS]
+
+
+def bench_hint_functions(players: int) -> Benchmark:
+    """Compute every hint on every possible hand."""
+    fcombinations = tb.get_tables(players).fcombinations
+    functions = [hint['function'] for hint in ut.HINTS.values()]
+    return lambda: None, lambda _: [list(map(function, fcombinations)) for function in functions]
+
+
+def late_session(players: int, seed: int) -> ss.HelperSession:
+    """Return a helper session after the hints of a late game."""
+    fcombination, hints = play_hints(players, seed, STAGES['late'] + 1)
+    session = ss.HelperSession(fcombination, players)
+    for hint, answers in hints:
+        session.apply_hint(hint, answers)
+    return session
+
+
+def bench_undo(players: int, seed: int) -> Benchmark:
+    """Undo the last hint of a late game."""
+    session = late_session(players, seed)
+    return lambda: copy.deepcopy(session), lambda session: session.undo()
+
+
+def bench_replay(players: int, seed: int) -> Benchmark:
+    """Remove the first hint of a late game, which replays every hint after it."""
+    session = late_session(players, seed)
+
+    def setup() -> ss.HelperSession:
+        # Every run starts without the states cached by the previous run
+        bs.clear()
+        return copy.deepcopy(session)
+    return setup, lambda session: session.remove_hint(0)
+
+
+def bench_bot_turn(players: int, seed: int) -> Benchmark:
+    """Let a companion bot choose a hint among all the hints after a few turns."""
+    fcombination, _ = deal(players, seed)
+    session = ss.CompanionSession(players, [fcombination], random.Random(seed))
+    rng = random.Random(seed)
+    for turn in range(STAGES['mid']):
+        session.apply_hint(turn % players, rng.choice(list(ut.HINTS)))
+    bot = session.bot_players[0]
+
+    def setup() -> None:
+        # Every run starts without the simulations cached by the previous run
+        sm.clear()
+        session.bot_games = [board.with_masks(board.get_masks()) for board in session.bot_games]
+    return setup, lambda _: session.bot_move(bot, tuple(ut.HINTS))
+
+
+def get_benchmarks(seed: int) -> Dict[str, Callable[[], Benchmark]]:
+    """Return the setup function of every benchmark by name."""
+    benchmarks = {}
+    for players in (2, 3, 4):
+        benchmarks[f'board_init/{players}p'] = lambda p=players: bench_board_init(p, seed)
+        for stage in STAGES:
+            benchmarks[f'apply_hint/{players}p/{stage}'] = \
+                lambda p=players, s=stage: bench_apply_hint(p, seed, s)
+            benchmarks[f'simulate/{players}p/{stage}'] = \
+                lambda p=players, s=stage: bench_simulate(p, seed, s)
+        if players > 2:
+            for stage in STAGES:
+                benchmarks[f'filter_known_tiles/{players}p/{stage}'] = \
+                    lambda p=players, s=stage: bench_filter_known_tiles(p, seed, s)
+        benchmarks[f'undo/{players}p'] = lambda p=players: bench_undo(p, seed)
+        benchmarks[f'replay/{players}p'] = lambda p=players: bench_replay(p, seed)
+        benchmarks[f'bot_turn/{players}p'] = lambda p=players: bench_bot_turn(p, seed)
+    for players in (3, 4):
+        benchmarks[f'hint_functions/{5 if players < 4 else 4}tiles'] = lambda p=players: bench_hint_functions(p)
+    return benchmarks
+
+
+def measure(setup: Callable[[], Benchmark], repeat: int) -> Dict[str, float]:
+    """Return the median time in seconds and the peak memory in KiB of a benchmark."""
+    prepare, run = setup()
+    run(prepare())  # Warm up the caches
+    times = []
+    for _ in range(repeat):
+        state = prepare()
+        start = time.perf_counter()
+        run(state)
+        times.append(time.perf_counter() - start)
+
+    state = prepare()
+    tracemalloc.start()
+    run(state)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {'seconds': statistics.median(times), 'peak_kib': peak / 1024}
+
+
+def compare(results: Dict[str, Dict[str, float]],
+            baseline: Dict[str, Dict[str, float]],
+            threshold: float) -> List[str]:
+    """Return the description of the results that regressed past the threshold."""
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        for metric in ('seconds', 'peak_kib'):
+            before, after = baseline[name][metric], result[metric]
+            # Ignore the noise on tiny measurements
+            floor = 1e-4 if metric == 'seconds' else 16
+            if after > max(before, floor) * (1 + threshold):
+                regressions.append(f'{name} {metric}: {before:.4g} -> {after:.4g} (+{after / max(before, floor) - 1:.0%})')
+    return regressions
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse the command line arguments."""
+    parser = argparse.ArgumentParser(description='Break the Code Benchmarks')
+    parser.add_argument('-k', '--filter', default='', help='only run the benchmarks containing this text')
+    parser.add_argument('--repeat', type=int, default=5, help='number of timed runs per benchmark')
+    parser.add_argument('--seed', type=int, default=2024, help='seed of the game scenarios')
+    parser.add_argument('--baseline', default=BASELINE_PATH, help='path of the baseline JSON file')
+    parser.add_argument('--save-baseline', action='store_true', help='save the results as the new baseline')
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help='relative regression allowed before failing (default: 0.25)')
+    return parser.parse_args()
+
+
+def main() -> None:
+    """Run the benchmarks."""
+    args = parse_args()
+
+    baseline = {}
+    if not args.save_baseline and os.path.exists(args.baseline):
+        with open(args.baseline, encoding='utf-8') as baseline_file:
+            data = json.load(baseline_file)
+        if data['seed'] == args.seed:
+            baseline = data['results']
+        else:
+            print(f'Warning: The baseline was recorded with seed {data["seed"]}, ignoring it')
+
+    results = {}
+    for name, setup in get_benchmarks(args.seed).items():
+        if args.filter not in name:
+            continue
+        results[name] = measure(setup, args.repeat)
+        change = ''
+        if name in baseline:
+            change = f'{results[name]["seconds"] / max(baseline[name]["seconds"], 1e-9) - 1:+.0%}'
+        print(f'{name:<32}{results[name]["seconds"] * 1000:>10.2f} ms{results[name]["peak_kib"]:>12.1f} KiB  {change}')
+
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as baseline_file:
+            json.dump({'seed': args.seed,
+                       'python': platform.python_version(),
+                       'results': results}, baseline_file, indent=2)
+        print(f'\nBaseline saved to {args.baseline}')
+        return
+
+    regressions = compare(results, baseline, args.threshold)
+    if len(regressions) > 0:
+        print(f'\n{len(regressions)} regression(s) past {args.threshold:.0%}:')
+        for regression in regressions:
+            print('- ' + regression)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,36 @@
+"""Break the Code Opening Book.
+
+Rank all the hints on the initial board of every possible hand, so that the helper and the
+companion bots read the first simulation instead of computing it:
+
+    python book.py --workers 4
+"""
+
+
+import argparse
+import os
+import time
+
+import engine.book as bk
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse the command line arguments."""
+    parser = argparse.ArgumentParser(description='Break the Code Opening Book')
+    parser.add_argument('-o', '--output', default=bk.get_book_path(),
+                        help='path of the opening book (default: %(default)s)')
+    parser.add_argument('-w', '--workers', type=int, default=os.cpu_count() or 1,
+                        help='number of worker processes (default: number of CPUs)')
+    return parser.parse_args()
+
+
+def main() -> None:
+    """Build the opening book."""
+    args = parse_args()
+    start = time.perf_counter()
+    path = bk.build_book(args.output, args.workers)
+    print(f'Opening book of {os.path.getsize(path) / 1024:.0f} KiB built in {time.perf_counter() - start:.0f} s: {path}')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,139 +1,770 @@
 """Board of the game."""
 
 
+from typing import Dict, Iterable, List, Tuple
+import collections
 import copy
-import itertools
+import random
 import statistics
-from typing import List, Tuple
-import engine.utils as ut
+import time
 import engine.combination as cb
+import engine.tables as tb
+
+
+# Critical value of the 95% confidence intervals of the sampled simulations
+CONFIDENCE_Z = 1.96
+
+# Maximum number of hands of the first opponents enumerated by the joint simulation before sampling them
+JOINT_LIMIT = 20000
+
+# Number of hands of the first opponents sampled by the joint simulation
+JOINT_SAMPLES = 2000
+
+# Maximum number of hands of the first opponents enumerated to weight the central fcombinations exactly
+WIN_LIMIT = 50000
 
 
 class Board:
-    """Store information on possible opponent hands."""
+    """Store information on possible opponent hands.
+
+    The possible fcombinations of the central tiles and of every opponent are masks over the
+    fcombinations of the tables shared by all the boards, so that filtering them is a bitwise AND.
+    """
 
     def __init__(self, fcombination: Tuple[int, ...], players: int = 2) -> None:
         """Generate initial opponent hands."""
         self._our_fcombination = fcombination
+        self._tables = tb.get_tables(players)
+        self._free_fives = 2 - cb.split_fives(fcombination)[1]
         # Generate the opponent fcombinations
-        self._central_fcombinations = self._generate_opponent_fcombinations(players)
-        self._opponents_fcombinations = [self.get_central_fcombinations() for _ in range(1, players)]
-
-    def _generate_opponent_fcombinations(self, players: int = 2) -> List[Tuple[int, ...]]:
-        """Generate all the possible fcombinations of the opponent."""
-        positions = 5 if players < 4 else 4
-        raw_fcombinations = list(itertools.combinations(list(i for i in range(20)), positions))
-        filtered_fcombinations = []
-        our_fives = self._our_fcombination.count(10) + self._our_fcombination.count(11)
-        for fcombination in raw_fcombinations:
-            # Remove a hand that has any of our tiles
-            if len(set(self._our_fcombination).intersection(set(fcombination))) > 0:
-                continue
-            # If we have no 5 tiles, remove symmetric opponent hands with one 5 tile
-            if our_fives == 0 and \
-               fcombination.count(10) + fcombination.count(11) == 1 and \
-               11 in fcombination:
-                continue
-            filtered_fcombinations.append(tuple(fcombination))
+        self._central_mask = self._generate_opponent_mask()
+        self._opponents_masks = [self._central_mask for _ in range(1, players)]
+        self._joint_prefixes = None  # type: List[Tuple[List[int], int, int]] | None
+        self._central_counts = {}  # type: Dict[Tuple[int, int], int]
+        # Joint deals of the central tiles and of the opponents, False when there are too many of them
+        self._central_deals = None  # type: List[Tuple[int, List[int], int]] | bool | None
+        # Number of joint deals of every central fcombination, and win probabilities by hint
+        self._central_weights = None  # type: Dict[int, int] | None
+        self._hints_win_probabilities = {}  # type: Dict[str, float | None]
+        # Masks of the possible answers of every opponent by hint, and simulations by set of hints
+        self._answer_masks = {}  # type: Dict[str, List[Dict[int | str | Tuple[str, ...], int]]]
+        self._hints_simulations = {}  # type: Dict[Tuple[str, ...], Tuple[float, float]]
+
+    @classmethod
+    def public(cls, players: int = 2) -> 'Board':
+        """Return a board knowing no tiles, whose opponents are all the players, for the public answers."""
+        board = cls((), players)
+        board._opponents_masks.append(board._central_mask)
+        return board
+
+    def __deepcopy__(self, memo: Dict[int, object]) -> 'Board':
+        """Return a copy of the board sharing the tables."""
+        board = copy.copy(self)
+        board._opponents_masks = list(self._opponents_masks)
+        return board
+
+    def _generate_opponent_mask(self) -> int:
+        """Generate the mask of all the possible fcombinations of the opponent."""
+        tile_masks = self._tables.tile_masks
+        mask = self._tables.universe
+        # Remove a hand that has any of our tiles, or more 5 tiles than we left
+        for ftile in cb.split_fives(self._our_fcombination)[0]:
+            mask &= ~tile_masks[ftile]
+        return mask & self._get_fives_mask(self._free_fives)
+
+    def _get_fives_mask(self, fives: int) -> int:
+        """Return the mask of the fcombinations holding at most the given number of 5 tiles."""
+        return self._tables.fives_masks[min(max(fives, 0), 2)]
 
-        return filtered_fcombinations
+    def _get_labeled_weight(self, deal: Iterable[int]) -> int:
+        """Return the number of deals of the tiles that a deal of fcombination indices stands for.
+
+        The two 5 tiles are the same tile in the fcombinations, but swapping them between two hands,
+        or between a hand and the tiles left out, is another deal.
+        """
+        if self._free_fives == 2 and any(self._tables.fives[index] == 1 for index in deal):
+            return 2
+        return 1
+
+    def _get_compatible_mask(self, index: int) -> int:
+        """Return the mask of the fcombinations that can be held together with the fcombination of an index."""
+        tile_masks = self._tables.tile_masks
+        compatible_mask = self._tables.universe
+        for ftile in self._tables.plain_ftiles[index]:
+            compatible_mask &= ~tile_masks[ftile]
+        return compatible_mask & self._get_fives_mask(self._free_fives - self._tables.fives[index])
 
     def _filter_combinations(self,
-                             fcombinations: List[Tuple[int, ...]],
+                             mask: int,
                              hint: str,
-                             answer: int | str | List[str]) -> List[Tuple[int, ...]]:
+                             answer: int | str | List[str]) -> int:
         """Return the filtered fcombinations after applying the given hint with its result."""
-        return [fcombination for fcombination in fcombinations
-                if ut.HINTS[hint]['function'](fcombination) == answer]
-
-    def _filter_known_tiles(self,
-                            fcombinations: List[Tuple[int, ...]],
-                            target_fcombinations: List[Tuple[int, ...]]) -> List[Tuple[int, ...]]:
-        """Returns the filtered fcombinations without known tiles in the target fcombinations."""
-        if len(target_fcombinations) == 0:
-            return fcombinations
-        
-        known_tiles = set.intersection(*[set(fcomb) for fcomb in target_fcombinations])
-        if len(known_tiles) == 0:
-            return fcombinations
-        
-        filtered_fcombinations = []  
-        replace_five = 10 in known_tiles and 11 not in known_tiles        
-        for fcombination in fcombinations:
-            if replace_five:
-                fcombination = cb.fcombination_replace_five_tile(fcombination)
-            for matched_tile in known_tiles:
-                if matched_tile in fcombination:
-                    break
-            else:
-                filtered_fcombinations.append(tuple(fcombination))
-        return filtered_fcombinations
+        if isinstance(answer, list):
+            answer = tuple(answer)
+        return mask & self._tables.answer_masks[hint].get(answer, 0)
+
+    def _get_known_fives(self, mask: int) -> int:
+        """Return the number of 5 tiles held by all the fcombinations."""
+        fives_masks = self._tables.fives_masks
+        return 2 if mask & fives_masks[1] == 0 else 1 if mask & fives_masks[0] == 0 else 0
+
+    def _get_exclusion_mask(self, mask: int, used_fives: int = 0) -> int:
+        """Return the mask of the fcombinations that can not be held with the known tiles of the fcombinations.
+
+        The fcombinations with too many 5 tiles are only excluded when the fcombinations hold some of them.
+        """
+        tile_masks = self._tables.tile_masks
+        plain_ftiles = self._tables.plain_ftiles
+        # The known tiles are held by the first and the last fcombinations
+        first = (mask & -mask).bit_length() - 1
+        last = mask.bit_length() - 1
+        exclusion_mask = 0
+        for ftile in plain_ftiles[first]:
+            if ftile in plain_ftiles[last] and mask & ~tile_masks[ftile] == 0:
+                exclusion_mask |= tile_masks[ftile]
+        if self._tables.fives[first] == 0 or self._tables.fives[last] == 0:
+            return exclusion_mask
+        known_fives = self._get_known_fives(mask)
+        if known_fives == 0:
+            return exclusion_mask
+        return exclusion_mask | ~self._get_fives_mask(self._free_fives - used_fives - known_fives)
+
+    def get_held_exclusion_mask(self, opponent: int) -> int:
+        """Return the mask of the fcombinations that an opponent knows can not be held, given the tiles they surely hold."""
+        mask = self._opponents_masks[opponent]
+        if mask == 0:
+            return 0
+        tile_masks = self._tables.tile_masks
+        exclusion_mask = 0
+        for ftile in self._tables.plain_ftiles[(mask & -mask).bit_length() - 1]:
+            if mask & ~tile_masks[ftile] == 0:
+                exclusion_mask |= tile_masks[ftile]
+        # The opponent does not know our tiles, so only their own 5 tiles limit the others
+        known_fives = self._get_known_fives(mask)
+        if known_fives > 0:
+            exclusion_mask |= ~self._tables.fives_masks[2 - known_fives]
+        return exclusion_mask
+
+    def _filter_known_tiles(self, mask: int, *target_masks: int) -> int:
+        """Returns the filtered fcombinations without known tiles in the target fcombinations.
+
+        The two 5 tiles are interchangeable, so they are counted instead of being known by their ftile.
+        """
+        known_fives = 0
+        for target_mask in target_masks:
+            if target_mask != 0:
+                mask &= ~self._get_exclusion_mask(target_mask)
+                known_fives += self._get_known_fives(target_mask)
+        return mask & self._get_fives_mask(self._free_fives - known_fives)
+
+    def _is_supported(self, index: int, other_masks: List[int]) -> bool:
+        """Return whether every other set can still hold tiles if one of them has the fcombination of an index.
+
+        The tiles known to be held by another set once the fcombination is held are also excluded.
+        """
+        compatible_mask = self._get_compatible_mask(index)
+        filtered_masks = []
+        for mask in other_masks:
+            mask &= compatible_mask
+            if mask == 0:
+                return False
+            filtered_masks.append(mask)
+        if len(filtered_masks) < 2:
+            return True
+
+        fives = self._tables.fives[index]
+        exclusions = [self._get_exclusion_mask(mask, fives) for mask in filtered_masks]
+        if not any(exclusions):
+            return True
+        for index, mask in enumerate(filtered_masks):
+            for target, exclusion_mask in enumerate(exclusions):
+                if target != index:
+                    mask &= ~exclusion_mask
+            if mask == 0:
+                return False
+        return True
+
+    def _get_hitting_mask(self, mask: int, target_mask: int) -> int:
+        """Return the fcombinations that can not be held together with any of the target fcombinations."""
+        tile_masks = self._tables.tile_masks
+        plain_ftiles = self._tables.plain_ftiles
+        fives = self._tables.fives
+        for index in tb.iter_indices(target_mask):
+            if mask == 0:
+                break
+            conflict_mask = 0
+            for ftile in plain_ftiles[index]:
+                conflict_mask |= tile_masks[ftile]
+            mask &= conflict_mask | ~self._get_fives_mask(self._free_fives - fives[index])
+        return mask
+
+    def _filter_unsupported(self, mask: int, other_masks: List[int]) -> int:
+        """Returns the filtered fcombinations that can be held together with the other fcombinations."""
+        for other_mask in other_masks:
+            mask &= ~self._get_hitting_mask(mask, other_mask)
+        if len(other_masks) < 2:
+            return mask
+
+        unsupported = [index for index in tb.iter_indices(mask) if not self._is_supported(index, other_masks)]
+        if len(unsupported) == 0:
+            return mask
+        return mask & ~tb.indices_to_mask(unsupported, len(self._tables.fcombinations))
+
+    def _propagate(self, masks: List[int], changed: Iterable[int]) -> List[int]:
+        """Return the opponent masks once every opponent only has fcombinations that the others allow.
+
+        An opponent is revised when another one changed, until none changes anymore.
+        """
+        changed = set(changed)
+        worklist = collections.deque(index for index in range(len(masks)) if len(changed - {index}) > 0)
+        queued = set(worklist)
+        while worklist:
+            index = worklist.popleft()
+            queued.discard(index)
+            other_masks = [mask for other, mask in enumerate(masks) if other != index]
+            filtered_mask = self._filter_unsupported(masks[index], other_masks)
+            if filtered_mask != masks[index]:
+                masks[index] = filtered_mask
+                for other in range(len(masks)):
+                    if other != index and other not in queued:
+                        worklist.append(other)
+                        queued.add(other)
+        return masks
+
+    def _mask_to_fcombinations(self, mask: int) -> List[Tuple[int, ...]]:
+        """Return the fcombinations of a mask."""
+        fcombinations = self._tables.fcombinations
+        return [fcombinations[i] for i in tb.iter_indices(mask)]
+
+    def get_fcombinations_counts(self) -> List[int]:
+        """Return the number of possible central fcombinations, followed by those of every opponent."""
+        return [tb.count(self._central_mask)] + [tb.count(mask) for mask in self._opponents_masks]
+
+    def is_consistent(self) -> bool:
+        """Return whether the central tiles and every opponent have at least one possible fcombination left."""
+        return self._central_mask != 0 and all(mask != 0 for mask in self._opponents_masks)
 
     def get_central_fcombinations(self) -> List[Tuple[int, ...]]:
         """Return the possible central fcombinations."""
-        return copy.deepcopy(self._central_fcombinations)
-    
+        return self._mask_to_fcombinations(self._central_mask)
+
     def get_opponents_fcombinations(self) -> List[List[Tuple[int, ...]]]:
         """Return the possible opponents fcombinations."""
-        return copy.deepcopy(self._opponents_fcombinations)
+        return [self._mask_to_fcombinations(mask) for mask in self._opponents_masks]
 
     def get_opponent_fcombinations(self, opponent: int = 0) -> List[Tuple[int, ...]]:
         """Return the possible fcombinations of the opponent."""
-        return copy.deepcopy(self._opponents_fcombinations[opponent])
+        return self._mask_to_fcombinations(self._opponents_masks[opponent])
+
+    def get_weights(self, opponent: int, mask: int) -> Dict[int, int]:
+        """Return the number of ways to complete every fcombination of a mask of an opponent, or of the central tiles for -1.
+
+        The fcombinations of every other opponent and of the central tiles compatible with a
+        fcombination are counted separately and multiplied, which estimates how likely it is.
+        """
+        if len(self._opponents_masks) == 1:
+            return {index: 1 for index in tb.iter_indices(mask)}
+        if opponent == -1:
+            other_masks = self._opponents_masks
+        else:
+            other_masks = self._opponents_masks[:opponent] + self._opponents_masks[opponent + 1:] + [self._central_mask]
+
+        weights = {}
+        for index in tb.iter_indices(mask):
+            compatible_mask = self._get_compatible_mask(index)
+            weight = 1
+            for other_mask in other_masks:
+                weight *= tb.count(other_mask & compatible_mask)
+                if weight == 0:
+                    break
+            weights[index] = weight
+        return weights
 
     def apply_hint(self, hint: str, answer: int | str | List[str], opponent: int = 0) -> None:
         """Apply a hint on the current board state."""
-        opponent_fcombinations = self._filter_combinations(self.get_opponent_fcombinations(opponent),
-                                                           hint,
-                                                           answer)
-
-        opponents = len(self._opponents_fcombinations)
-        if opponents == 1:
-            self._central_fcombinations = opponent_fcombinations
-            self._opponents_fcombinations[0] = opponent_fcombinations
-            return
+        self.apply_hints(hint, [(opponent, answer)])
+
+    def apply_hints(self, hint: str, answers: List[Tuple[int, int | str | List[str]]]) -> None:
+        """Apply the answers of the opponents to a hint together on the current board state.
 
-        other_opponent_numbers = [opp for opp in range(opponents) if opp != opponent]
-        other_opponent_fcombinations = [self.get_opponent_fcombinations(opp) for opp in other_opponent_numbers]
+        The opponent fcombinations are propagated until they are all consistent, before removing their
+        known tiles from the central fcombinations.
+        """
+        self._joint_prefixes = None
+        self._central_counts = {}
+        self._central_deals = None
+        self._central_weights = None
+        self._hints_win_probabilities = {}
+        self._answer_masks = {}
+        self._hints_simulations = {}
+        masks = list(self._opponents_masks)
+        for opponent, answer in answers:
+            masks[opponent] = self._filter_combinations(masks[opponent], hint, answer)
+        if len(masks) == 1:
+            self._central_mask = masks[0]
+            self._opponents_masks = masks
+            return
 
-        filtered_fcombinations = []
-        for opponent_fcombination in opponent_fcombinations:
-            filtered_opponent_combinations = [self._filter_known_tiles(
-                fcomb, [opponent_fcombination]) for fcomb in other_opponent_fcombinations]
+        self._opponents_masks = self._propagate(masks, [opponent for opponent, _ in answers])
+        self._central_mask = self._filter_known_tiles(self._central_mask, *self._opponents_masks)
 
-            if len(filtered_opponent_combinations) < 2:
-                possible_opponent_combinations = filtered_opponent_combinations[0]
-            else:
-                possible_opponent_combinations = self._filter_known_tiles(
-                    filtered_opponent_combinations[0], filtered_opponent_combinations[1])
+    def with_hint(self, hint: str, answers: List[Tuple[int, int | str | List[str]]]) -> 'Board':
+        """Return a new board with the answers to a hint applied, leaving this one unchanged.
 
-            if len(possible_opponent_combinations) > 0:
-                filtered_fcombinations.append(opponent_fcombination)
+        The masks are immutable integers, so the new board shares the unchanged ones with this board.
+        """
+        board = copy.copy(self)
+        board.apply_hints(hint, answers)
+        return board
 
-        opponent_fcombinations = filtered_fcombinations
-        for index, fcombinations in enumerate(self._opponents_fcombinations):
-            if index == opponent:
-                self._opponents_fcombinations[index] = opponent_fcombinations
-            else:
-                self._opponents_fcombinations[index] = self._filter_known_tiles(fcombinations,
-                                                                                opponent_fcombinations)
+    def get_masks(self) -> Tuple[int, ...]:
+        """Return the mask of the central fcombinations, followed by those of every opponent."""
+        return (self._central_mask, *self._opponents_masks)
 
-        for fcombinations in self._opponents_fcombinations:
-            self._central_fcombinations = self._filter_known_tiles(self._central_fcombinations,
-                                                                   fcombinations)
+    def with_masks(self, masks: Tuple[int, ...]) -> 'Board':
+        """Return a new board with the given masks, as returned by get_masks, leaving this one unchanged."""
+        board = copy.copy(self)
+        board._central_mask, board._opponents_masks = masks[0], list(masks[1:])
+        board._joint_prefixes = None
+        board._central_counts = {}
+        board._central_deals = None
+        board._central_weights = None
+        board._hints_win_probabilities = {}
+        board._answer_masks = {}
+        board._hints_simulations = {}
+        return board
 
     def simulate(self, hint: str) -> Tuple[float, float]:
         """Return the average % of filtered combinations, and the standard deviation."""
+        return self.simulate_hints((hint,))
+
+    def get_answer_masks(self, hint: str) -> List[Dict[int | str | Tuple[str, ...], int]]:
+        """Return the masks of the fcombinations of every opponent giving each of their possible answers to a hint.
+
+        The masks are kept until the board changes, so that scoring many sets of hints only splits
+        the fcombinations once per hint.
+        """
+        if hint not in self._answer_masks:
+            answer_masks = self._tables.answer_masks[hint].items()
+            self._answer_masks[hint] = [{answer: opponent_mask & mask for answer, mask in answer_masks
+                                         if opponent_mask & mask != 0}
+                                        for opponent_mask in self._opponents_masks]
+        return self._answer_masks[hint]
+
+    def get_partition(self, hint: str) -> List[List[int]]:
+        """Return the masks of the fcombinations of every opponent giving each possible answer to a hint."""
+        return [list(masks.values()) for masks in self.get_answer_masks(hint)]
+
+    def get_answer_counts(self, hint: str) -> List[Dict[int | str | Tuple[str, ...], int]]:
+        """Return the number of fcombinations of every opponent giving each of their possible answers to a hint.
+
+        The counts are those of the fcombinations of the opponent alone, before the answer is
+        propagated to the other opponents.
+        """
+        return [{answer: tb.count(mask) for answer, mask in masks.items()} for masks in self.get_answer_masks(hint)]
+
+    def simulate_hints(self, hints: Tuple[str, ...]) -> Tuple[float, float]:
+        """Return the average % of combinations filtered by the answers to several hints together, and the standard deviation.
+
+        Every opponent is split by the tuples of their answers, by intersecting the partitions of the
+        hints, which is how a single hint is scored by simulate.
+        """
+        key = tuple(sorted(set(hints)))
+        if key in self._hints_simulations:
+            return self._hints_simulations[key]
+
         mean_filtered = []
         stdev_filtered = []
 
-        for opponent_fcombinations in self.get_opponents_fcombinations():
-            answers = [ut.HINTS[hint]['function'](fcombination) for fcombination in opponent_fcombinations]
-            answers_count = {answer:answers.count(answer) for answer in answers}
+        partitions = [self.get_partition(hint) for hint in key]
+        for opponent, opponent_mask in enumerate(self._opponents_masks):
+            answers_masks = partitions[0][opponent]
+            for partition in partitions[1:]:
+                answers_masks = [mask & other for mask in answers_masks for other in partition[opponent]
+                                 if mask & other != 0]
+            answers_count = [tb.count(mask) for mask in answers_masks]
 
-            current_count = len(opponent_fcombinations)
-            percentage_filtered = [(current_count - count) / current_count for _, count in answers_count.items()]
+            current_count = tb.count(opponent_mask)
+            percentage_filtered = [(current_count - count) / current_count for count in answers_count]
             mean_filtered.append(0 if len(percentage_filtered) < 1 else statistics.mean(percentage_filtered))
             stdev_filtered.append(0 if len(percentage_filtered) < 2 else statistics.stdev(percentage_filtered) * 100)
 
+        self._hints_simulations[key] = (statistics.mean(mean_filtered), statistics.mean(stdev_filtered))
+        return self._hints_simulations[key]
+
+    def _is_coarser(self, hint: str, other: str) -> bool:
+        """Return whether the answers to a hint split every opponent into unions of the splits of another hint."""
+        for partition, other_partition in zip(self.get_partition(hint), self.get_partition(other)):
+            if len(partition) > len(other_partition):
+                return False
+            for other_mask in other_partition:
+                if not any(other_mask & ~mask == 0 for mask in partition):
+                    return False
+        return True
+
+    def get_dominated(self, hints: Tuple[str, ...]) -> Dict[str, str | None]:
+        """Return the hints revealing nothing more than another of the hints, with that hint, or None if they reveal nothing.
+
+        A hint is dominated when its answers split every opponent into unions of the splits of
+        another hint, which then tells at least as much. Of hints splitting the opponents the same
+        way, the first one is kept.
+        """
+        dominated = {hint: None for hint in hints
+                     if all(len(partition) < 2 for partition in self.get_partition(hint))}  # type: Dict[str, str | None]
+        informative = [hint for hint in dict.fromkeys(hints) if hint not in dominated]
+        for position, hint in enumerate(informative):
+            for other_position, other in enumerate(informative):
+                if other == hint or other in dominated or not self._is_coarser(hint, other):
+                    continue
+                # Of two hints splitting the opponents the same way, the later one is dominated
+                if other_position < position or not self._is_coarser(other, hint):
+                    dominated[hint] = other
+                    break
+        return dominated
+
+    def _get_joint_prefixes(self) -> List[Tuple[List[int], int, int]]:
+        """Return the hands of all the opponents but the last one, with their weight and the mask of the last hands.
+
+        The hands are enumerated, or sampled with their importance weight when there are too many of
+        them. They do not depend on the hint, so they are kept until the board changes.
+        """
+        if self._joint_prefixes is not None:
+            return self._joint_prefixes
+
+        masks = self._opponents_masks[:-1]
+        size = 1
+        for mask in masks:
+            size *= tb.count(mask)
+        if size <= JOINT_LIMIT:
+            deals = ((deal, 1, held_mask, fives) for deal, held_mask, fives in self._iter_fcombinations(masks))
+        else:
+            # The same deals are sampled every time, so that the hints are compared on them
+            rng = random.Random(0)
+            deals = ((deal, weight) + self._hold_deal(deal)
+                     for deal, weight in (self._sample_fcombinations(masks, rng) for _ in range(JOINT_SAMPLES))
+                     if weight > 0)
+        self._joint_prefixes = [(deal, weight,
+                                 self._opponents_masks[-1] & ~held_mask & self._get_fives_mask(self._free_fives - fives))
+                                for deal, weight, held_mask, fives in deals]
+        return self._joint_prefixes
+
+    def count_joint_answers(self, hint: str) -> Dict[Tuple[int | str | Tuple[str, ...], ...], float]:
+        """Return the number of joint opponent deals giving every tuple of answers to a hint.
+
+        The hands of the first opponents are grouped by their answers and by the hands left to the last
+        opponent, whose hands are then counted once per group for each of its answers.
+        """
+        answers = self._tables.answers[hint]
+        groups = collections.Counter()
+        for deal, weight, last_mask in self._get_joint_prefixes():
+            # The 5 tiles are apart once a first opponent holds a single one, or else if the last one does
+            labeled = self._get_labeled_weight(deal)
+            groups[tuple(answers[index] for index in deal), last_mask, labeled] += weight
+
+        last_answer_masks = [(answer, self._opponents_masks[-1] & answer_mask)
+                             for answer, answer_mask in self._tables.answer_masks[hint].items()
+                             if self._opponents_masks[-1] & answer_mask != 0]
+        single_five_mask = self._get_fives_mask(1) & ~self._get_fives_mask(0) if self._free_fives == 2 else 0
+        counts = collections.Counter()
+        for (key, last_mask, labeled), weight in groups.items():
+            for answer, answer_mask in last_answer_masks:
+                count = tb.count(answer_mask & last_mask)
+                if count > 0:
+                    if labeled == 1:
+                        count += tb.count(answer_mask & last_mask & single_five_mask)
+                    counts[key + (answer,)] += weight * labeled * count
+        return counts
+
+    def _hold_deal(self, deal: List[int]) -> Tuple[int, int]:
+        """Return the mask of the tiles that can not be held anymore and the 5 tiles held by a deal."""
+        held_mask, fives = 0, 0
+        for index in deal:
+            held_mask, fives = self._hold_fcombination(index, held_mask, fives)
+        return held_mask, fives
+
+    def simulate_joint(self, hint: str) -> Tuple[float, float]:
+        """Return the average % of filtered joint opponent deals over the answer tuples, and the standard deviation.
+
+        Unlike simulate, the answers of all the opponents to the hint are taken together.
+        """
+        if len(self._opponents_masks) == 1:
+            return self.simulate(hint)
+        counts = self.count_joint_answers(hint).values()
+        total = sum(counts)
+        if total == 0:
+            return 0, 0
+        percentage_filtered = [(total - count) / total for count in counts]
+        return (statistics.mean(percentage_filtered),
+                0 if len(percentage_filtered) < 2 else statistics.stdev(percentage_filtered) * 100)
+
+    def _count_central_after(self, opponent: int, opponent_mask: int) -> int:
+        """Return the number of central fcombinations left once the fcombinations of an opponent are filtered.
+
+        The counts are kept by filtered mask, which the answers of different hints often share.
+        """
+        if (opponent, opponent_mask) not in self._central_counts:
+            masks = list(self._opponents_masks)
+            masks[opponent] = opponent_mask
+            self._central_counts[opponent, opponent_mask] = tb.count(self._filter_known_tiles(self._central_mask, *masks))
+        return self._central_counts[opponent, opponent_mask]
+
+    def simulate_central_answer(self,
+                                hint: str,
+                                opponent: int,
+                                answer: int | str | List[str] | None = None) -> float:
+        """Return the average % of central combinations filtered by the answers of an opponent, or by a given answer."""
+        central_count = tb.count(self._central_mask)
+        opponent_mask = self._opponents_masks[opponent]
+        if central_count == 0:
+            return 0
+        if answer is not None:
+            masks = [self._filter_combinations(opponent_mask, hint, answer)]
+        else:
+            masks = [opponent_mask & mask for mask in self._tables.answer_masks[hint].values() if opponent_mask & mask != 0]
+        if len(masks) == 0:
+            return 0
+        return statistics.mean((central_count - self._count_central_after(opponent, mask)) / central_count for mask in masks)
+
+    def simulate_central(self, hint: str) -> Tuple[float, float]:
+        """Return the average % of filtered combinations of the opponents and of the central tiles, and the standard deviation.
+
+        The central tiles are scored like one more opponent, by the central fcombinations left after
+        every answer of every opponent.
+        """
+        if len(self._opponents_masks) == 1:
+            return self.simulate(hint)
+
+        mean_filtered = []
+        stdev_filtered = []
+        central_mean_filtered = []
+        central_stdev_filtered = []
+
+        central_count = tb.count(self._central_mask)
+        answer_masks = self._tables.answer_masks[hint].values()
+        for opponent, opponent_mask in enumerate(self._opponents_masks):
+            current_count = tb.count(opponent_mask)
+            for counts, current, means, stdevs in (
+                    ([tb.count(opponent_mask & mask) for mask in answer_masks if opponent_mask & mask != 0],
+                     current_count, mean_filtered, stdev_filtered),
+                    ([self._count_central_after(opponent, opponent_mask & mask) for mask in answer_masks
+                      if opponent_mask & mask != 0], central_count, central_mean_filtered, central_stdev_filtered)):
+                percentage_filtered = [(current - count) / current for count in counts]
+                means.append(0 if len(percentage_filtered) < 1 else statistics.mean(percentage_filtered))
+                stdevs.append(0 if len(percentage_filtered) < 2 else statistics.stdev(percentage_filtered) * 100)
+
+        mean_filtered.append(statistics.mean(central_mean_filtered))
+        stdev_filtered.append(statistics.mean(central_stdev_filtered))
         return statistics.mean(mean_filtered), statistics.mean(stdev_filtered)
+
+    def _get_central_deals(self) -> List[Tuple[int, List[int], int]] | None:
+        """Return every joint deal as the central fcombination index, those of the opponents and its weight, or None if there are too many.
+
+        All the tiles are dealt, so once the central tiles and the first opponents hold theirs, the
+        hand of the last opponent is the tiles left, if it is one of its fcombinations. Only the
+        hands of the first opponents are enumerated, when they are at most WIN_LIMIT. The weight of a
+        deal is the number of deals of the tiles it stands for, which tell the two 5 tiles apart. The
+        deals do not depend on the hint, so they are kept until the board changes.
+        """
+        if self._central_deals is not None:
+            return None if self._central_deals is False else self._central_deals
+        if len(self._opponents_masks) == 1:
+            # The central tiles are the hand of the only opponent
+            self._central_deals = [(index, [index], self._get_labeled_weight([index]))
+                                   for index in tb.iter_indices(self._central_mask)]
+            return self._central_deals
+
+        masks = self._opponents_masks[:-1]
+        # The hands of every first opponent compatible with the central tiles bound the enumerated ones
+        enumerated = 0
+        for central_index in tb.iter_indices(self._central_mask):
+            compatible_mask = self._get_compatible_mask(central_index)
+            bound = 1
+            for mask in masks:
+                bound *= tb.count(mask & compatible_mask)
+            enumerated += bound
+            if enumerated > WIN_LIMIT:
+                self._central_deals = False
+                return None
+
+        deals = []
+        for central_index in tb.iter_indices(self._central_mask):
+            held_mask, fives = self._hold_fcombination(central_index, 0, 0)
+            for deal, deal_mask, deal_fives in self._iter_fcombinations(masks, held_mask, fives):
+                last_mask = self._opponents_masks[-1] & ~deal_mask & self._get_fives_mask(self._free_fives - deal_fives)
+                deals.extend((central_index, deal + [index], self._get_labeled_weight([central_index] + deal + [index]))
+                             for index in tb.iter_indices(last_mask))
+        self._central_deals = deals
+        return deals
+
+    def get_central_deals(self) -> List[Tuple[int, List[int], int]] | None:
+        """Return every joint deal as the central fcombination index, those of the opponents and its weight, or None if there are too many."""
+        return self._get_central_deals()
+
+    def get_central_weights(self) -> Dict[int, int] | None:
+        """Return the number of joint deals of every central fcombination index, or None if there are too many to count."""
+        if self._central_weights is None:
+            deals = self._get_central_deals()
+            if deals is None:
+                return None
+            weights = collections.Counter()
+            for central_index, _, weight in deals:
+                weights[central_index] += weight
+            self._central_weights = dict(weights)
+        return self._central_weights
+
+    def get_win_probability(self) -> Tuple[float, Tuple[int, ...] | None] | None:
+        """Return the probability that the most likely central fcombination is right, and that fcombination.
+
+        It is None if there are too many joint deals to count them, and the fcombination is None if
+        there is no joint deal left.
+        """
+        weights = self.get_central_weights()
+        if weights is None:
+            return None
+        if len(weights) == 0:
+            return 0, None
+        central_index = max(weights, key=lambda index: (weights[index], -index))
+        return weights[central_index] / sum(weights.values()), self._tables.fcombinations[central_index]
+
+    def get_hint_win_probability(self, hint: str) -> float | None:
+        """Return the expected probability of guessing the central tiles right once the opponents answered a hint.
+
+        For every tuple of answers, the most likely central fcombination is guessed. It is None if
+        there are too many joint deals to count them. The probabilities are kept until the board
+        changes, since the menus ask for them again on every redraw.
+        """
+        if hint in self._hints_win_probabilities:
+            return self._hints_win_probabilities[hint]
+        deals = self._get_central_deals()
+        if deals is None or len(deals) == 0:
+            probability = None if deals is None else 0
+        else:
+            answers = self._tables.answers[hint]
+            weights = collections.Counter()
+            for central_index, deal, weight in deals:
+                weights[tuple(answers[index] for index in deal), central_index] += weight
+            best = {}
+            for (key, _), weight in weights.items():
+                best[key] = max(best.get(key, 0), weight)
+            probability = sum(best.values()) / sum(self.get_central_weights().values())
+        self._hints_win_probabilities[hint] = probability
+        return probability
+
+    def sample_deal(self, rng: random.Random) -> Tuple[List[int], int]:
+        """Draw the fcombination index of every opponent, then of the central tiles, consistent with each other.
+
+        Every fcombination is drawn among those that are compatible with the previous ones, so the
+        deal comes with its importance weight, the product of the numbers of choices and of the deals
+        of the tiles it stands for, which is 0 for a dead end. The central tiles are the opponent in a
+        2-player game.
+        """
+        masks = self._opponents_masks + ([self._central_mask] if len(self._opponents_masks) > 1 else [])
+        deal, weight = self._sample_fcombinations(masks, rng)
+        return deal, weight * self._get_labeled_weight(deal)
+
+    def _hold_fcombination(self, index: int, excluded_mask: int, fives: int) -> Tuple[int, int]:
+        """Return the mask of the tiles that can not be held anymore and the 5 tiles held, once a fcombination is held."""
+        tile_masks = self._tables.tile_masks
+        for ftile in self._tables.plain_ftiles[index]:
+            excluded_mask |= tile_masks[ftile]
+        return excluded_mask, fives + self._tables.fives[index]
+
+    def _sample_fcombinations(self, masks: List[int], rng: random.Random) -> Tuple[List[int], int]:
+        """Draw one fcombination index per mask, compatible with the previous ones, and the importance weight."""
+        excluded_mask = 0
+        fives = 0
+        deal = []
+        weight = 1
+        for mask in masks:
+            mask &= ~excluded_mask & self._get_fives_mask(self._free_fives - fives)
+            choices = tb.count(mask)
+            if choices == 0:
+                return deal, 0
+            weight *= choices
+            index = tb.get_index(mask, rng.randrange(choices))
+            deal.append(index)
+            excluded_mask, fives = self._hold_fcombination(index, excluded_mask, fives)
+        return deal, weight
+
+    def _iter_fcombinations(self,
+                            masks: List[int],
+                            excluded_mask: int = 0,
+                            fives: int = 0) -> Iterable[Tuple[List[int], int, int]]:
+        """Yield every combination of compatible fcombination indices of the masks, with the held tiles and 5 tiles."""
+        if len(masks) == 0:
+            yield [], excluded_mask, fives
+            return
+        mask = masks[0] & ~excluded_mask & self._get_fives_mask(self._free_fives - fives)
+        for index in tb.iter_indices(mask):
+            held_mask, held_fives = self._hold_fcombination(index, excluded_mask, fives)
+            for deal, deal_mask, deal_fives in self._iter_fcombinations(masks[1:], held_mask, held_fives):
+                yield [index] + deal, deal_mask, deal_fives
+
+    def simulate_sampled(self,
+                         hints: Tuple[str, ...],
+                         time_budget: float = 1.0,
+                         rng: random.Random | None = None,
+                         min_samples: int = 50,
+                         max_samples: int = 100000) -> Dict[str, Tuple[float, float, int]]:
+        """Estimate the expected % of filtered combinations of the hints over consistent joint deals.
+
+        Return the estimate, the half-width of its 95% confidence interval and the number of deals of
+        every hint. The sampling stops once the best hint is separated from the others, after the
+        time budget in seconds, or after the maximum number of deals.
+        """
+        rng = rng or random.Random()
+        answers = self._tables.answers
+        # Fraction of the fcombinations of every opponent filtered out by every answer to every hint
+        filtered = {}
+        for hint in hints:
+            filtered[hint] = []
+            for mask in self._opponents_masks:
+                # An opponent without any fcombination left is never dealt, and filters nothing
+                current_count = tb.count(mask)
+                filtered[hint].append({answer: 0 if current_count == 0 else 1 - tb.count(mask & answer_mask) / current_count
+                                       for answer, answer_mask in self._tables.answer_masks[hint].items()})
+
+        opponents = len(self._opponents_masks)
+        weights, weights_squared = 0, 0
+        sums = dict.fromkeys(hints, 0.0)
+        squares = dict.fromkeys(hints, 0.0)
+        samples = 0
+
+        def get_estimates() -> Dict[str, Tuple[float, float, int]]:
+            """Return the weighted means and their confidence intervals with the effective number of deals."""
+            if weights == 0:
+                return {hint: (0.0, 0.0, samples) for hint in hints}
+            effective = weights * weights / weights_squared
+            estimates = {}
+            for hint in hints:
+                mean = sums[hint] / weights
+                variance = max(0.0, squares[hint] / weights - mean * mean)
+                estimates[hint] = (mean, CONFIDENCE_Z * (variance / effective) ** 0.5, samples)
+            return estimates
+
+        start = time.perf_counter()
+        while samples < max_samples:
+            deal, weight = self.sample_deal(rng)
+            samples += 1
+            if weight > 0:
+                weights += weight
+                weights_squared += weight * weight
+                for hint in hints:
+                    gain = sum(filtered[hint][opponent][answers[hint][deal[opponent]]]
+                               for opponent in range(opponents)) / opponents
+                    sums[hint] += weight * gain
+                    squares[hint] += weight * gain * gain
+
+            if samples % 10 != 0:
+                continue
+            # The time budget holds even when no consistent deal was drawn yet
+            if time.perf_counter() - start > time_budget:
+                break
+            if samples < min_samples or weights == 0:
+                continue
+            estimates = get_estimates()
+            ranking = sorted(hints, key=lambda h: estimates[h][0], reverse=True)
+            best = estimates[ranking[0]]
+            if all(best[0] - best[1] > estimates[h][0] + estimates[h][1] for h in ranking[1:]):
+                break
+        return get_estimates()
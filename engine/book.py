@@ -0,0 +1,164 @@
+"""Opening book of the hint rankings on the initial board.
+
+The first simulation only depends on our tiles and on the number of tiles in a hand, since the
+opponents of an initial board all have the same possible fcombinations. The book stores the ranking
+of all the hints for every possible hand.
+
+The file starts with a JSON header line, followed by one fixed-size record per fcombination of the
+tables, in the order of the tables, for every hand size:
+
+- the indices of the hints in `ut.HINTS`, best first
+- the mean and the standard deviation of every hint in `ut.HINTS` order, as unsigned 16-bit
+  integers in units of 1/10000 and 1/100
+"""
+
+
+from typing import Dict, Iterator, List, Tuple
+import array
+import contextlib
+import json
+import mmap
+import multiprocessing
+import os
+
+import engine.board as bd
+import engine.combination as cb
+import engine.tables as tb
+import engine.utils as ut
+
+
+# Increase the version whenever the format or the content of the book changes
+BOOK_VERSION = 2
+
+_books = {}  # type: Dict[str, Tuple[Dict[int, int], mmap.mmap] | None]
+
+
+def get_book_path() -> str:
+    """Return the path of the opening book file."""
+    return os.path.join(tb.CACHE_DIR, f'opening-book-v{BOOK_VERSION}.bin')
+
+
+def get_record_size() -> int:
+    """Return the size in bytes of the record of a hand."""
+    return len(ut.HINTS) * 5
+
+
+def get_header(sections: Dict[int, int]) -> Dict:
+    """Return the header of a book with the offset of the records of every hand size."""
+    return {'version': BOOK_VERSION,
+            'engine': tb.TABLES_VERSION,
+            'hints': list(ut.HINTS),
+            'sections': {str(positions): offset for positions, offset in sections.items()}}
+
+
+def rank_hints(fcombination: Tuple[int, ...], players: int) -> bytes:
+    """Return the record of a hand: the hint ranking and the simulation of every hint on the initial board."""
+    import engine.session as ss
+
+    board = bd.Board(fcombination, players)
+    simulations = ss.sort_simulations([(hint, board.simulate(hint)) for hint in ut.HINTS])
+    values = dict(simulations)
+    ranking = bytes(list(ut.HINTS).index(hint) for hint, _ in simulations)
+    quantized = array.array('H', (min(round(value * scale), 65535)
+                                  for hint in ut.HINTS for value, scale in zip(values[hint], (10000, 100))))
+    return ranking + quantized.tobytes()
+
+
+def _rank_hints(args: Tuple[Tuple[int, ...], int]) -> bytes:
+    """Return the record of a hand from a pool worker."""
+    return rank_hints(*args)
+
+
+def iter_records(positions: int, workers: int = 1) -> Iterator[bytes]:
+    """Yield the record of every fcombination of the tables for a hand size."""
+    players = 2 if positions == 5 else 4
+    hands = [(f, players) for f in tb.get_tables(players).fcombinations]
+
+    with multiprocessing.Pool(workers) if workers > 1 else contextlib.nullcontext() as pool:
+        yield from map(_rank_hints, hands) if pool is None else pool.imap(_rank_hints, hands, chunksize=64)
+
+
+def build_book(path: str | None = None, workers: int = 1) -> str:
+    """Build the opening book for all the hand sizes, and return its path."""
+    path = path or get_book_path()
+    record_size = get_record_size()
+    sections, offset = {}, 0
+    for positions in (5, 4):
+        sections[positions] = offset
+        offset += len(tb.get_tables(2 if positions == 5 else 4).fcombinations) * record_size
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    # Write to a temporary file first so that a partial book is never read
+    with open(path + '.tmp', 'wb') as book_file:
+        book_file.write(json.dumps(get_header(sections)).encode() + b'\n')
+        for positions in sections:
+            for record in iter_records(positions, workers):
+                book_file.write(record)
+    os.replace(path + '.tmp', path)
+    _books.pop(path, None)
+    return path
+
+
+def open_book(path: str | None = None) -> Tuple[Dict[int, int], mmap.mmap] | None:
+    """Return the offset of every hand size and the records of the book, or None if it is missing or outdated."""
+    path = path or get_book_path()
+    if path in _books:
+        return _books[path]
+
+    book = None
+    try:
+        with open(path, 'rb') as book_file:
+            header = json.loads(book_file.readline())
+            start = book_file.tell()
+            records = mmap.mmap(book_file.fileno(), 0, access=mmap.ACCESS_READ)
+        sections = {int(positions): offset for positions, offset in header['sections'].items()}
+        size = sum(len(tb.get_tables(2 if p == 5 else 4).fcombinations) for p in sections) * get_record_size()
+        # The version of the book and of the tables it was built with must match the engine
+        if header == get_header(sections) and len(records) == start + size:
+            book = ({positions: start + offset for positions, offset in sections.items()}, records)
+        else:
+            records.close()
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        book = None
+    _books[path] = book
+    return book
+
+
+def lookup(fcombination: Tuple[int, ...],
+           players: int = 2,
+           path: str | None = None) -> List[Tuple[str, Tuple[float, float]]] | None:
+    """Return the simulations of all the hints on the initial board, best first, or None without a book."""
+    book = open_book(path)
+    if book is None:
+        return None
+    sections, records = book
+    positions = tb.get_positions(players)
+    index = tb.get_tables(players).index.get(cb.canonical_fcombination(fcombination))
+    if index is None or positions not in sections:
+        return None
+
+    record_size = get_record_size()
+    start = sections[positions] + index * record_size
+    record = records[start:start + record_size]
+    hints = list(ut.HINTS)
+    values = array.array('H', record[len(hints):])
+    return [(hints[i], (values[2 * i] / 10000, values[2 * i + 1] / 100)) for i in record[:len(hints)]]
+
+
+def get_simulations(fcombination: Tuple[int, ...],
+                    players: int,
+                    hints: Tuple[str, ...],
+                    path: str | None = None) -> List[Tuple[str, Tuple[float, float]]] | None:
+    """Return the simulations of the given hints on the initial board, best first, or None without a book."""
+    simulations = lookup(fcombination, players, path)
+    if simulations is None:
+        return None
+    return [simulation for simulation in simulations if simulation[0] in hints]
+
+
+def clear_books() -> None:
+    """Close the books opened in memory."""
+    for book in _books.values():
+        if book is not None:
+            book[1].close()
+    _books.clear()
@@ -0,0 +1,118 @@
+"""Browse the candidates of a board page by page.
+
+A query is a list of terms separated by spaces, that the candidates must all match:
+
+- `b=7b`: the tile at position b is 7b
+- `5g`: the hand holds a 5 tile (`5` works too)
+- `-3w`: the hand does not hold 3w
+- `b=7`, `-7`: a number alone stands for the tiles of both colours
+
+Every term is a mask of the tables, so that filtering the candidates is a bitwise AND and only the
+candidates of the displayed page are materialized.
+"""
+
+
+from typing import Dict, List, Tuple
+import itertools
+
+import engine.board as bd
+import engine.combination as cb
+import engine.tables as tb
+import engine.utils as ut
+
+
+PAGE_SIZE = 20
+
+POSITION_NAMES = 'abcde'
+
+
+def get_ftiles(tile: str) -> Tuple[int, ...]:
+    """Return the ftiles of a tile name, or of both colours of a number."""
+    if tile.isdigit() and len(tile) == 1:
+        return tuple(ftile for ftile, name in enumerate(ut.TILES) if name[0] == tile)
+    if tile not in ut.TILES:
+        raise ValueError(f'Tile {tile} is not recognized as a valid tile')
+    return cb.FIVE_FTILES if tile == '5g' else (ut.TILES.index(tile),)
+
+
+def get_ftiles_mask(masks: Tuple[int, ...], tile: str) -> int:
+    """Return the union of the masks of the ftiles of a tile name."""
+    mask = 0
+    for ftile in get_ftiles(tile):
+        mask |= masks[ftile]
+    return mask
+
+
+def get_query_mask(query: str, players: int = 2) -> int:
+    """Return the mask of the fcombinations matching a query."""
+    tables = tb.get_tables(players)
+    position_masks = tb.get_position_masks(players)
+    mask = tables.universe
+    for term in query.lower().split():
+        if '=' in term:
+            name, tile = term.split('=', 1)
+            position = POSITION_NAMES.find(name) if len(name) == 1 else -1
+            if not 0 <= position < len(position_masks):
+                raise ValueError(f'Position {name} is not valid')
+            mask &= get_ftiles_mask(position_masks[position], tile)
+        elif term.startswith('-'):
+            mask &= ~get_ftiles_mask(tables.tile_masks, term[1:])
+        else:
+            mask &= get_ftiles_mask(tables.tile_masks, term)
+    return mask
+
+
+class Browser:
+    """Page through the candidates of an opponent, or of the central tiles for -1, the most likely first."""
+
+    def __init__(self, board: bd.Board, players: int = 2, opponent: int = -1, page_size: int = PAGE_SIZE) -> None:
+        """Browse all the candidates from the first page."""
+        self.board = board
+        self.players = players
+        self.opponent = opponent
+        self.page_size = page_size
+        self.candidates_mask = board.get_masks()[0 if opponent == -1 else opponent + 1]
+        self.query = ''
+        self.mask = self.candidates_mask
+        self.page = 0
+        # Weights of the candidates computed so far, and the indices of the matching ones sorted by them
+        self._weights = {}  # type: Dict[int, int]
+        self._weighted_mask = 0
+        self._order = None  # type: List[int] | None
+
+    def filter(self, query: str) -> None:
+        """Only browse the candidates matching a query, from the first page."""
+        self.mask = self.candidates_mask & get_query_mask(query, self.players)
+        self.query = query.strip()
+        self.page = 0
+        self._order = None
+
+    def count(self) -> int:
+        """Return the number of matching candidates."""
+        return tb.count(self.mask)
+
+    def pages(self) -> int:
+        """Return the number of pages."""
+        return max(1, -(-self.count() // self.page_size))
+
+    def _get_order(self) -> List[int]:
+        """Return the indices of the matching candidates, the most likely first."""
+        if self._order is None:
+            self._weights.update(self.board.get_weights(self.opponent, self.mask & ~self._weighted_mask))
+            self._weighted_mask |= self.mask
+            self._order = sorted(tb.iter_indices(self.mask), key=lambda index: -self._weights[index])
+        return self._order
+
+    def get_page(self) -> List[Tuple[Tuple[int, ...], float]]:
+        """Return the candidates of the current page with their likelihood among the matching candidates."""
+        fcombinations = tb.get_tables(self.players).fcombinations
+        start = self.page * self.page_size
+        if self.players == 2:
+            # Every candidate of the only opponent is as likely, so the page is read from the mask
+            indices = list(itertools.islice(tb.iter_indices(self.mask), start, start + self.page_size))
+            return [(fcombinations[index], 1 / self.count()) for index in indices]
+
+        order = self._get_order()
+        total = sum(self._weights[index] for index in order)
+        return [(fcombinations[index], self._weights[index] / total if total > 0 else 0)
+                for index in order[start:start + self.page_size]]
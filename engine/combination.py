@@ -1,23 +1,36 @@
 """Transform combinations."""
 
 
-from typing import Tuple
+from typing import Iterable, List, Set, Tuple
 import engine.utils as ut
 
 
+# The two 5 tiles are the same tile, so a hand holding one of them holds the first 5 ftile, and a hand
+# holding both holds the two of them: every hand has a single fcombination
+FIVE_FTILES = (10, 11)
+
+
+def canonical_fcombination(ftiles: Iterable[int]) -> Tuple[int, ...]:
+    """Return the fcombination of ftiles, whichever 5 ftiles they hold."""
+    ftiles = list(ftiles)
+    fives = sum(1 for ftile in ftiles if ftile in FIVE_FTILES)
+    return tuple(sorted([ftile for ftile in ftiles if ftile not in FIVE_FTILES] + list(FIVE_FTILES[:fives])))
+
+
+def is_canonical(fcombination: Tuple[int, ...]) -> bool:
+    """Return whether a fcombination holds its 5 tiles as canonical_fcombination does."""
+    return FIVE_FTILES[1] not in fcombination or FIVE_FTILES[0] in fcombination
+
+
+def split_fives(fcombination: Tuple[int, ...]) -> Tuple[Tuple[int, ...], int]:
+    """Return the ftiles of a fcombination other than the 5 tiles, and its number of 5 tiles."""
+    ftiles = tuple(ftile for ftile in fcombination if ftile not in FIVE_FTILES)
+    return ftiles, len(fcombination) - len(ftiles)
+
+
 def combination_to_fcombination(combination: Tuple[str, ...]) -> Tuple[int, ...]:
     """Convert a combination to a fcombination."""
-    fcombination = []
-    # Add the non-5 tiles
-    for tile in combination:
-        if tile != '5g':
-            fcombination.append(ut.TILES.index(tile))
-    # Add the 5 tiles
-    if combination.count('5g') == 1:
-        fcombination.append(10)
-    elif combination.count('5g') == 2:
-        fcombination.extend([10, 11])
-    return tuple(sorted(fcombination))
+    return canonical_fcombination(ut.TILES.index(tile) for tile in combination)
 
 
 def fcombination_to_numbers(fcombination: Tuple[int, ...]) -> Tuple[int, ...]:
@@ -32,10 +45,17 @@ def fcombination_to_colors(fcombination: Tuple[int, ...]) -> Tuple[str, ...]:
                  'g' for ftile in fcombination)
 
 
-def fcombination_replace_five_tile(fcombination: Tuple[int, ...]) -> Tuple[int, ...]:
-    """Return fcombination with 5 tile replaced by a paired tile."""
-    if 10 in fcombination and 11 not in fcombination:
-        f_list = list(fcombination)
-        f_list[f_list.index(10)] = 11
-        fcombination = tuple(f_list)
-    return fcombination
+def get_fcombination_positions(fcombinations: List[Tuple[int, ...]], players: int = 2) -> List[Set[int]]:
+    """Returns tile possibilities per position."""
+    positions = [set() for _ in range(5 if players < 4 else 4)]
+
+    for fcombination in fcombinations:
+        for index, ftile in enumerate(fcombination):
+            positions[index].add(ftile)
+
+    # Both 5 ftiles are the same tile
+    for position in positions:
+        if FIVE_FTILES[1] in position:
+            position.discard(FIVE_FTILES[1])
+            position.add(FIVE_FTILES[0])
+    return positions
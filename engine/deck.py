@@ -0,0 +1,77 @@
+"""Hint cards of a game: face up, used, and still in the deck.
+
+Only FACE_UP hint cards can be chosen at a time. A card is discarded once a player asks its hint,
+and replaced by the top card of the deck, so the cards that are neither face up nor used are the
+cards that can become visible next, each as likely. The players only see the cards face up, so the
+deck state is kept from the cards entered in the menus and from the hints asked.
+"""
+
+
+from typing import Iterable, List, Set, Tuple
+
+import engine.board as bd
+import engine.utils as ut
+
+
+# Number of hint cards face up
+FACE_UP = 6
+
+CARDS = tuple(ut.HINTS)
+
+
+class Deck:
+    """Keep track of the hint cards seen face up and used in a game."""
+
+    def __init__(self, face_up: Iterable[str] = (), used: Iterable[str] = (), shown: Iterable[str] = ()) -> None:
+        """Start with the given cards face up, used, and seen face up before."""
+        self.used = list(used)
+        self.face_up = [card for card in face_up if card not in self.used]
+        self.shown = set(shown) | set(self.face_up)  # type: Set[str]
+
+    def show(self, cards: Iterable[str]) -> None:
+        """Record the cards face up, replacing the previous ones, up to FACE_UP cards."""
+        self.face_up = [card for card in dict.fromkeys(cards) if card not in self.used][:FACE_UP]
+        self.shown.update(self.face_up)
+
+    def use(self, card: str) -> None:
+        """Discard a card asked by a player."""
+        self.used.append(card)
+        if card in self.face_up:
+            self.face_up.remove(card)
+
+    def unuse(self) -> None:
+        """Put the last used card back face up."""
+        card = self.used.pop()
+        if card in self.shown and card not in self.used and len(self.face_up) < FACE_UP:
+            self.face_up.append(card)
+
+    def get_seen(self) -> Set[str]:
+        """Return the cards seen face up or used."""
+        return self.shown | set(self.used)
+
+    def get_remaining(self) -> List[str]:
+        """Return the cards never seen, which are still in the deck."""
+        seen = self.get_seen()
+        return [card for card in CARDS if card not in seen]
+
+    def get_counts(self) -> Tuple[int, int, int]:
+        """Return the numbers of cards face up, used and still in the deck."""
+        return len(self.face_up), len(self.used), len(self.get_remaining())
+
+
+def simulate_card(board: bd.Board, hint: str, face_up: Iterable[str], remaining: List[str]) -> Tuple[float, float]:
+    """Return the simulation of a hint counting the card asked next, and the standard deviation of the hint alone.
+
+    Asking a hint leaves the other cards face up, plus a card drawn from the remaining ones. The
+    hint is worth the average of its own simulation and of the simulation of the best pair of hints
+    it forms with one of those cards, on average over the drawn card. The cards asked by the other
+    players in between are ignored.
+    """
+    others = [card for card in face_up if card != hint]
+    kept = max((board.simulate_hints((hint, other)) for other in others),
+               key=lambda simulation: simulation[0], default=board.simulate_hints((hint,)))
+    now = board.simulate_hints((hint,))
+    drawn = [card for card in remaining if card != hint]
+    simulations = [max(kept, board.simulate_hints((hint, card)), key=lambda simulation: simulation[0])
+                   for card in drawn] or [kept]
+    return ((now[0] + sum(mean for mean, _ in simulations) / len(simulations)) / 2, now[1])
@@ -0,0 +1,216 @@
+"""Columnar export of board states for offline analysis.
+
+An export is a directory holding one raw file of little-endian fixed-width values per column, and a
+`manifest.json` file describing them:
+
+    {"version": 1,
+     "engine": 4,
+     "hints": ["st", "sb", ...],
+     "tables": {"snapshots": {"rows": 12, "columns": {"snapshot": {"file": "snapshots.snapshot.bin",
+                                                                   "dtype": "<u4"}, ...}},
+                "candidates": {...},
+                "simulations": {...}},
+     "universes": {"5": {"size": 12444,
+                         "fcombinations": {"file": "universe-5.fcombinations.bin", "dtype": "u1",
+                                           "shape": [12444, 5]},
+                         "answers": {"st": {"file": "universe-5.answers.st.bin", "dtype": "u1",
+                                            "values": [...]}, ...}}}}
+
+The `engine` version is the TABLES_VERSION of the tables the fcombinations and the answers come
+from. The tables are:
+
+- `snapshots`: one row per board state, with its `players`, hand size (`positions`) and `hints`
+  applied so far, and a `label` listed in the manifest
+- `candidates`: one row per candidate of every board state, with its `snapshot`, its `domain` (-1
+  for the central tiles, then every opponent) and its `index` in the fcombinations of the universe
+- `simulations`: one row per simulated hint of a board state, with its `snapshot`, the index of
+  its `hint` in the hints, and its `mean` and `stdev`
+
+Every universe holds its fcombinations as rows of ftiles, and the answer of every fcombination to
+every hint as the index of the answer in the `values` of the hint. The rows are appended as they
+come and the manifest is rewritten on every flush, so that an export can be read while it grows,
+for example with `numpy.memmap(path, dtype, mode='r')`.
+"""
+
+
+from typing import Dict, List, Tuple
+import array
+import json
+import mmap
+import os
+import sys
+
+import engine.board as bd
+import engine.tables as tb
+import engine.utils as ut
+
+
+# Increase the version whenever the format of the exports changes
+EXPORT_VERSION = 1
+
+MANIFEST = 'manifest.json'
+
+# Number of buffered candidates above which the rows are appended to the column files
+FLUSH_ROWS = 1 << 18
+
+# Columns of every table with their array type code and dtype
+TABLES = {'snapshots': {'snapshot': ('I', '<u4'), 'players': ('B', 'u1'), 'positions': ('B', 'u1'),
+                        'hints': ('H', '<u2')},
+          'candidates': {'snapshot': ('I', '<u4'), 'domain': ('b', 'i1'), 'index': ('H', '<u2')},
+          'simulations': {'snapshot': ('I', '<u4'), 'hint': ('B', 'u1'), 'mean': ('f', '<f4'), 'stdev': ('f', '<f4')}}
+
+TYPECODES = {'u1': 'B', 'i1': 'b', '<u2': 'H', '<u4': 'I', '<f4': 'f'}
+
+HINT_CODES = {hint: code for code, hint in enumerate(ut.HINTS)}
+
+
+def _write_array(path: str, values: array.array, mode: str = 'ab') -> None:
+    """Write the values of an array to a file in little-endian byte order."""
+    if sys.byteorder == 'big':
+        values = array.array(values.typecode, values)
+        values.byteswap()
+    with open(path, mode) as column_file:
+        values.tofile(column_file)
+
+
+class Exporter:
+    """Append board states to a columnar export."""
+
+    def __init__(self, directory: str) -> None:
+        """Start a new export in a directory, replacing any previous one."""
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.rows = {table: 0 for table in TABLES}
+        self.labels = []  # type: List[str]
+        self.universes = {}  # type: Dict[str, Dict]
+        self._buffers = {table: {column: array.array(typecode) for column, (typecode, _) in columns.items()}
+                         for table, columns in TABLES.items()}
+        for table, columns in TABLES.items():
+            for column in columns:
+                open(self._get_path(f'{table}.{column}'), 'wb').close()
+        self.flush()
+
+    def _get_path(self, name: str) -> str:
+        """Return the path of a column file."""
+        return os.path.join(self.directory, f'{name}.bin')
+
+    def _add_universe(self, players: int) -> None:
+        """Write the fcombinations and the answer codes of the universe of a hand size, if not written yet."""
+        positions = tb.get_positions(players)
+        if str(positions) in self.universes:
+            return
+        tables = tb.get_tables(players)
+        name = f'universe-{positions}'
+        _write_array(self._get_path(f'{name}.fcombinations'),
+                     array.array('B', (ftile for fcombination in tables.fcombinations for ftile in fcombination)), 'wb')
+        answers = {}
+        for hint in ut.HINTS:
+            values = list(tables.answer_masks[hint])
+            codes = {value: code for code, value in enumerate(values)}
+            _write_array(self._get_path(f'{name}.answers.{hint}'),
+                         array.array('B', (codes[answer] for answer in tables.answers[hint])), 'wb')
+            answers[hint] = {'file': f'{name}.answers.{hint}.bin', 'dtype': 'u1', 'values': values}
+        self.universes[str(positions)] = {'size': len(tables.fcombinations),
+                                          'fcombinations': {'file': f'{name}.fcombinations.bin',
+                                                            'dtype': 'u1',
+                                                            'shape': [len(tables.fcombinations), positions]},
+                                          'answers': answers}
+
+    def _append(self, table: str, **values: int | float) -> None:
+        """Append a row to the buffers of a table."""
+        for column, value in values.items():
+            self._buffers[table][column].append(value)
+        self.rows[table] += 1
+
+    def add_masks(self,
+                  masks: Tuple[int, ...],
+                  players: int,
+                  hints: int = 0,
+                  label: str = '',
+                  simulations: List[Tuple[str, Tuple[float, float]]] | None = None) -> int:
+        """Append the masks of a board state with the simulations of its hints, and return its snapshot number."""
+        self._add_universe(players)
+        snapshot = self.rows['snapshots']
+        self._append('snapshots', snapshot=snapshot, players=players, positions=tb.get_positions(players), hints=hints)
+        self.labels.append(label)
+
+        candidates = self._buffers['candidates']
+        for domain, mask in enumerate(masks, -1):
+            indices = array.array('H', tb.iter_indices(mask))
+            candidates['snapshot'].extend(array.array('I', [snapshot]) * len(indices))
+            candidates['domain'].extend(array.array('b', [domain]) * len(indices))
+            candidates['index'].extend(indices)
+            self.rows['candidates'] += len(indices)
+
+        for hint, (mean, stdev) in simulations or []:
+            self._append('simulations', snapshot=snapshot, hint=HINT_CODES[hint], mean=mean, stdev=stdev)
+        if len(candidates['index']) >= FLUSH_ROWS:
+            self.flush()
+        return snapshot
+
+    def add_board(self,
+                  board: bd.Board,
+                  players: int,
+                  hints: int = 0,
+                  label: str = '',
+                  simulations: List[Tuple[str, Tuple[float, float]]] | None = None) -> int:
+        """Append a board state with the simulations of its hints, and return its snapshot number."""
+        return self.add_masks(board.get_masks(), players, hints, label, simulations)
+
+    def get_manifest(self) -> Dict:
+        """Return the manifest of the rows flushed so far."""
+        return {'version': EXPORT_VERSION,
+                'engine': tb.TABLES_VERSION,
+                'hints': list(ut.HINTS),
+                'labels': self.labels,
+                'tables': {table: {'rows': self.rows[table],
+                                   'columns': {column: {'file': f'{table}.{column}.bin', 'dtype': dtype}
+                                               for column, (_, dtype) in columns.items()}}
+                           for table, columns in TABLES.items()},
+                'universes': self.universes}
+
+    def flush(self) -> None:
+        """Append the buffered rows to the column files and rewrite the manifest."""
+        for table, columns in self._buffers.items():
+            for column, values in columns.items():
+                if len(values) > 0:
+                    _write_array(self._get_path(f'{table}.{column}'), values)
+                    del values[:]
+        path = os.path.join(self.directory, MANIFEST)
+        # Write to a temporary file first so that a partial manifest is never read
+        with open(path + '.tmp', 'w', encoding='utf-8') as manifest_file:
+            json.dump(self.get_manifest(), manifest_file)
+        os.replace(path + '.tmp', path)
+
+    def close(self) -> None:
+        """Flush the remaining rows."""
+        self.flush()
+
+
+def read_manifest(directory: str) -> Dict:
+    """Return the manifest of an export."""
+    with open(os.path.join(directory, MANIFEST), encoding='utf-8') as manifest_file:
+        return json.load(manifest_file)
+
+
+def open_column(directory: str, column: Dict, rows: int | None = None) -> memoryview:
+    """Return the values of a column of the manifest, memory-mapped, up to the given number of rows."""
+    typecode = TYPECODES[column['dtype']]
+    size = array.array(typecode).itemsize
+    with open(os.path.join(directory, column['file']), 'rb') as column_file:
+        length = os.fstat(column_file.fileno()).st_size
+        if length == 0:
+            return memoryview(b'').cast(typecode)
+        data = mmap.mmap(column_file.fileno(), 0, access=mmap.ACCESS_READ)
+    if sys.byteorder == 'big':
+        raise ValueError('Memory-mapped columns are little-endian')
+    # The rows appended after the manifest was written are left out
+    count = length // size if rows is None else min(rows, length // size)
+    return memoryview(data)[:count * size].cast(typecode)
+
+
+def open_table(directory: str, table: str) -> Dict[str, memoryview]:
+    """Return the memory-mapped columns of a table of an export."""
+    manifest = read_manifest(directory)
+    rows = manifest['tables'][table]['rows']
+    return {name: open_column(directory, column, rows) for name, column in manifest['tables'][table]['columns'].items()}
@@ -0,0 +1,211 @@
+"""Append-only journal of a game session.
+
+Every event of a session is appended to a JSON lines file as soon as it happens:
+
+    {"event": "start", "session": "helper", "players": 3, "fcombination": [0, 2, 4, 6, 8], ...}
+    {"event": "hint", "hint": "st", "answers": [[0, 20], [1, 22]]}
+    {"event": "undo"}
+    {"event": "cards", "cards": ["st", "tw", "nc", ...]}
+    {"event": "remove", "index": 2}
+    {"event": "checkpoint", "hints": [...], "masks": ["1f0c...", ...], ...}
+
+The `cards` events record the hint cards face up, and the `remove` events the hints removed from
+the middle of a helper game. Companion sessions also record the `end` moves of the players and the
+`bot` decisions. Every CHECKPOINT_INTERVAL events, a checkpoint records the state of the session
+with its boards as hexadecimal masks, so that resuming a game restores the last checkpoint and only
+replays the events after it. A line cut by a crash is ignored, and so are the checkpoints written
+with other tables.
+"""
+
+
+from typing import Dict, List, TextIO, Tuple
+import json
+import os
+
+import engine.deck as dk
+import engine.session as ss
+import engine.tables as tb
+
+
+# Number of events between two checkpoints
+CHECKPOINT_INTERVAL = 8
+
+
+def get_journal_path(program: str) -> str:
+    """Return the default path of the journal of a program."""
+    return os.path.join(tb.CACHE_DIR, f'journal-{program}.jsonl')
+
+
+def parse_answer(answer: int | str | List[str]) -> int | str | tuple:
+    """Return an answer read from JSON with the type of the hint functions."""
+    return tuple(answer) if isinstance(answer, list) else answer
+
+
+def parse_answers(answers: List[List]) -> List[Tuple]:
+    """Return the answers of the players read from JSON, keeping any extra field."""
+    return [(player, parse_answer(answer), *rest) for player, answer, *rest in answers]
+
+
+def get_start(session: 'ss.HelperSession | ss.CompanionSession') -> Dict:
+    """Return the start event of a session."""
+    start = {'event': 'start',
+             'players': session.players,
+             'time_budget': session.time_budget,
+             'scoring': session.scoring,
+             'endgame': session.endgame}
+    if isinstance(session, ss.HelperSession):
+        return start | {'session': 'helper', 'fcombination': session.fcombination}
+    return start | {'session': 'companion',
+                    'people_fcombinations': session.people_fcombinations,
+                    'central_fcombination': session.central_fcombination,
+                    'bot_fcombinations': session.bot_fcombinations}
+
+
+def get_deck(deck: dk.Deck) -> Dict:
+    """Return the hint cards face up and seen face up of a deck, the used ones being the hints of the session."""
+    return {'face_up': deck.face_up, 'shown': sorted(deck.shown)}
+
+
+def get_checkpoint(session: 'ss.HelperSession | ss.CompanionSession') -> Dict:
+    """Return the checkpoint event of the state of a session."""
+    if isinstance(session, ss.HelperSession):
+        return {'event': 'checkpoint',
+                'engine': tb.TABLES_VERSION,
+                'hints': session.hints,
+                'public_history': session.public_history,
+                'key': session.key,
+                'masks': [format(mask, 'x') for mask in session.board.get_masks()],
+                'deck': get_deck(session.deck)}
+    return {'event': 'checkpoint',
+            'engine': tb.TABLES_VERSION,
+            'history': session.history,
+            'keys': session.bot_keys,
+            'masks': [[format(mask, 'x') for mask in board.get_masks()] for board in session.bot_games],
+            'deck': get_deck(session.deck)}
+
+
+class Journal:
+    """Append the events of a session to a journal file."""
+
+    def __init__(self, path: str, session: 'ss.HelperSession | ss.CompanionSession', resume: bool = False) -> None:
+        """Open the journal of a session, starting a new one unless resuming it."""
+        self.path = path
+        self.session = session
+        self.events = 0
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._file = open(path, 'a' if resume else 'w', encoding='utf-8')  # type: TextIO
+        if not resume:
+            self._write(get_start(session))
+
+    def _write(self, event: Dict) -> None:
+        """Append an event and make sure it reaches the disk."""
+        self._file.write(json.dumps(event, separators=(',', ':'), ensure_ascii=False) + '\n')
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def record(self, event: Dict) -> None:
+        """Append an event of the session, followed by a checkpoint every CHECKPOINT_INTERVAL events."""
+        self._write(event)
+        self.events += 1
+        if self.events % CHECKPOINT_INTERVAL == 0:
+            self._write(get_checkpoint(self.session))
+
+    def close(self) -> None:
+        """Close the journal file."""
+        self._file.close()
+
+
+def read_events(path: str) -> Tuple[List[Dict], int]:
+    """Return the events of a journal up to the first line cut by a crash, and the size of their lines."""
+    events, size = [], 0
+    with open(path, 'rb') as journal_file:
+        for line in journal_file:
+            if not line.endswith(b'\n'):
+                break
+            try:
+                events.append(json.loads(line))
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                break
+            size += len(line)
+    return events, size
+
+
+def new_session(start: Dict) -> 'ss.HelperSession | ss.CompanionSession':
+    """Return the session of a start event."""
+    players = start['players']
+    if start['session'] == 'helper':
+        return ss.HelperSession(tuple(start['fcombination']), players, start['time_budget'], start['scoring'],
+                                start.get('endgame', 'expected'))
+
+    session = ss.CompanionSession(players, [tuple(fc) for fc in start['people_fcombinations']],
+                                  time_budget=start['time_budget'], scoring=start['scoring'],
+                                  endgame=start.get('endgame'))
+    # The tiles dealt to the central tiles and the bots are those of the journal
+    session.deal(tuple(start['central_fcombination']), [tuple(fc) for fc in start['bot_fcombinations']])
+    return session
+
+
+def restore_checkpoint(session: 'ss.HelperSession | ss.CompanionSession', checkpoint: Dict) -> None:
+    """Restore the state of a session from a checkpoint, leaving the boards before it to be rebuilt on undo."""
+    if isinstance(session, ss.HelperSession):
+        session.hints = [(hint, parse_answers(results)) for hint, results in checkpoint['hints']]
+        session.public_history = [(hint, parse_answers(answers)) for hint, answers in checkpoint['public_history']]
+        session.board = session.board.with_masks(tuple(int(mask, 16) for mask in checkpoint['masks']))
+        session.key = checkpoint['key']
+        restore_deck(session, checkpoint, [hint for hint, _ in session.hints])
+        return
+
+    session.history = [(player, hint, parse_answers(results)) for player, hint, results in checkpoint['history']]
+    session.bot_games = [board.with_masks(tuple(int(mask, 16) for mask in masks))
+                         for board, masks in zip(session.bot_games, checkpoint['masks'])]
+    session.bot_keys = checkpoint['keys']
+    restore_deck(session, checkpoint, [hint for _, hint, _ in session.history if hint not in ss.ENDING_MOVES])
+
+
+def restore_deck(session: 'ss.HelperSession | ss.CompanionSession', checkpoint: Dict, used: List[str]) -> None:
+    """Restore the hint cards of a session from a checkpoint and the hints asked so far."""
+    deck = checkpoint.get('deck', {})
+    session.deck = dk.Deck(deck.get('face_up', ()), used, deck.get('shown', ()))
+
+
+def replay_event(session: 'ss.HelperSession | ss.CompanionSession', event: Dict) -> None:
+    """Apply an event of the journal to a session."""
+    match event['event'], isinstance(session, ss.HelperSession):
+        case 'hint', True:
+            session.apply_hint(event['hint'], parse_answers(event['answers']))
+        case 'hint', False:
+            session.apply_hint(event['player'], event['hint'])
+        case 'end', False:
+            session.end_game(event['player'], event['move'])
+        case 'undo', _:
+            session.undo()
+        case 'cards', _:
+            session.show_cards(tuple(event['cards']))
+        case 'remove', True:
+            session.remove_hint(event['index'])
+        case _:
+            # The bot decisions and the checkpoints do not change the session
+            pass
+
+
+def resume(path: str) -> 'ss.HelperSession | ss.CompanionSession':
+    """Return the session of a journal, from its last checkpoint and the events after it, and keep journaling it."""
+    events, size = read_events(path)
+    if len(events) == 0 or events[0].get('event') != 'start':
+        raise ValueError(f'{path} is not a journal')
+
+    session = new_session(events[0])
+    tail = events[1:]
+    for index in range(len(events) - 1, 0, -1):
+        # The masks of a checkpoint are only valid with the tables they were written with
+        if events[index]['event'] == 'checkpoint' and events[index].get('engine') == tb.TABLES_VERSION:
+            restore_checkpoint(session, events[index])
+            tail = events[index + 1:]
+            break
+    for event in tail:
+        replay_event(session, event)
+
+    # The next events are appended after the last complete line
+    os.truncate(path, size)
+    session.journal = Journal(path, session, resume=True)
+    return session
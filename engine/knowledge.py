@@ -0,0 +1,65 @@
+"""Estimates of what the other players know.
+
+The answers are public, so a single public board holds the fcombinations of every player and of the
+central tiles that are consistent with them, and serves as the board of every player at once. On
+top of the public answers, a player only knows their own tiles, so their view also excludes the
+fcombinations that conflict with the tiles we know they hold.
+
+The public boards are only built when needed, from the cached states of the public answers, since
+they hold the fcombinations of one more player than our board.
+"""
+
+
+from typing import List, Tuple
+import statistics
+
+import engine.board as bd
+import engine.states as bs
+import engine.tables as tb
+import engine.utils as ut
+
+
+def get_answering_players(players: int, asker: int) -> List[int]:
+    """Return the players answering a hint asked by a player."""
+    return [player for player in range(players) if players == 4 or player != asker]
+
+
+def get_board(players: int, history: List[Tuple[str, List[Tuple[int, int | str | Tuple[str, ...]]]]]) -> bd.Board:
+    """Return the public board after the answers of the players to the hints of the history."""
+    board, _ = bs.get_board((), players, [(hint, answers) for hint, answers in history if len(answers) > 0],
+                            bd.Board.public(players))
+    return board
+
+
+def get_view_counts(public: bd.Board, player: int, held_exclusion_mask: int = 0) -> Tuple[int, ...]:
+    """Return the number of central fcombinations and of fcombinations of every player, as a player sees them.
+
+    The count of the player themselves is the number of fcombinations the others have for them.
+    """
+    central_mask, *masks = public.get_masks()
+    counts = [tb.count(central_mask & ~held_exclusion_mask)]
+    for other, mask in enumerate(masks):
+        counts.append(tb.count(mask if other == player else mask & ~held_exclusion_mask))
+    return tuple(counts)
+
+
+def simulate_others(public: bd.Board, hint: str, player: int, fcombination: Tuple[int, ...]) -> float:
+    """Return the average % of central combinations that the other players filter when a player asks a hint.
+
+    Every other player learns from the answers of the others, including ours that we know exactly.
+    """
+    players = len(public.get_masks()) - 1
+    if players == 2:
+        # The only other player answers the hint and learns nothing
+        return 0
+
+    answering = get_answering_players(players, player)
+    others_filtered = []
+    for other in range(players):
+        if other == player:
+            continue
+        filtered = [public.simulate_central_answer(hint, answerer, ut.HINTS[hint]['function'](fcombination)
+                                                   if answerer == player else None)
+                    for answerer in answering if answerer != other]
+        others_filtered.append(0 if len(filtered) == 0 else statistics.mean(filtered))
+    return statistics.mean(others_filtered)
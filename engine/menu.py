@@ -2,10 +2,16 @@
 
 
 import os
-from typing import List, Tuple
+from typing import Callable, Dict, List, Tuple
+import engine.combination as cb
 import engine.utils as ut
 
 
+br = ut.lazy_import('engine.browser')
+
+# Number of lines of the decision tree of the endgame shown in the main menu
+TREE_LINES = 20
+
 TITLE = """=============================
 === Break the Code Helper ===
 =============================
@@ -15,9 +21,17 @@ MAIN_MENU = """(h) Add hint
 (s) Simulate hints
 (c) Show remaining combinations
 (u) Undo (remove last hint)
+(p) Show profiling data
 (q) Quit
 """
 
+COMBINATIONS_MENU = """
+(n) Next page
+(p) Previous page
+(f) Filter the combinations
+(q) Go back
+"""
+
 HINT_SHORTCUTS = """(st) What is the sum of your tiles?                              (te) How many even tiles do you have?
 (sb) What is the sum of your black numbers?                      (to) How many odd tiles do you have?
 (sw) What is the sum of your white numbers?                      (tb) How many of your tiles have a black number?
@@ -70,6 +84,22 @@ def hint_result_as_str(answer: int | str | Tuple[str, ...]) -> str:
     return str(answer)
 
 
+def tree_as_lines(node: Tuple, players: int = 2, depth: int = 0) -> List[str]:
+    """Return the lines of a decision tree of the endgame: the first hint, then the hint to ask after every tuple of answers."""
+    hint, children = node
+    lines = [f'Ask: {ut.HINTS[hint]["description"]}'] if depth == 0 else []
+    for answers, child in children.items():
+        if players == 2:
+            answers_str = hint_result_as_str(answers[0])
+        else:
+            answers_str = ', '.join(f'#{opponent+1} {hint_result_as_str(answer)}' for opponent, answer in enumerate(answers))
+        next_str = 'guess' if child is None else f'ask {ut.HINTS[child[0]]["description"]}'
+        lines.append('  ' * (depth + 1) + f'{answers_str}: {next_str}')
+        if child is not None:
+            lines += tree_as_lines(child, players, depth + 1)
+    return lines
+
+
 def ask_number_of_players() -> int:
     """Ask the user for the number of players and return it."""
     while True:
@@ -151,26 +181,22 @@ def get_hint_shortcuts(players: int = 2) -> str:
     return HINT_SHORTCUTS.replace('(b, c, and d)', '(b, c)')
 
 
-def get_fcombination_positions(fcombinations: List[Tuple[int, ...]], players: int = 2):
-    """Returns tile possibilities per position."""
-    positions = [set() for _ in range(5 if players < 4 else 4)]
-
-    for fcombination in fcombinations:
-        for index, ftile in enumerate(fcombination):
-            position = positions[index]
-            if (ftile == 10 and 11 in position) or (ftile == 11 and 10 in position):
-                continue
-            position.add(ftile)
-
-    return positions
-
-
 def display_main_menu(our_fcombination: Tuple[int, ...],
                       central_fcombinations: List[Tuple[int, ...]],
                       opponents_fcombinations: List[List[Tuple[int, ...]]],
                       hints: List[Tuple[str, List[Tuple[int, str, int]]]],
-                      simulations: List[Tuple[str, Tuple[float, float]]]) -> str:
-    """Display the main menu and return a valid user choice."""
+                      simulations: List[Tuple[str, Tuple[float, float]]],
+                      knowledge: List[Tuple[int, ...]] | None = None,
+                      guess: Tuple[bool,
+                                   Tuple[float, Tuple[int, ...] | None] | None,
+                                   Tuple[str, float] | None] | None = None,
+                      deck: Tuple[int, int, int] | None = None,
+                      dominated: Dict[str, str | None] | None = None,
+                      endgame: Tuple[str, float, Tuple | None] | None = None) -> str:
+    """Display the main menu and return a valid user choice.
+
+    The endgame is the objective of the solver, with the number of hints and the decision tree.
+    """
     choice = None
     while True:
         clear_screen()
@@ -186,7 +212,7 @@ def display_main_menu(our_fcombination: Tuple[int, ...],
         else:
             print(f'\nCentral tile possibilities ({len(central_fcombinations)} left) per position:')
 
-        positions = get_fcombination_positions(central_fcombinations, players)
+        positions = cb.get_fcombination_positions(central_fcombinations, players)
         for index, position in enumerate(positions):
             print(f"{'abcde'[index]}: ", end='')
             print(ftiles_as_colored_tiles(tuple(sorted(list(position)))))
@@ -199,7 +225,7 @@ def display_main_menu(our_fcombination: Tuple[int, ...],
             opponents_positions = []
             opponent_positions_width = []
             for fcombinations in opponents_fcombinations:
-                positions = get_fcombination_positions(fcombinations, players)                
+                positions = cb.get_fcombination_positions(fcombinations, players)                
                 opponents_positions.append(positions)
                 opponent_positions_width.append(max(len(p) for p in positions) + gap_width + prefix_width)
 
@@ -232,6 +258,15 @@ def display_main_menu(our_fcombination: Tuple[int, ...],
                     hint_results = ', '.join(f'#{r[0]+1} {hint_result_as_str(r[1])} (-{r[2]} combs)' for r in results)                
                 print('- ' + ut.HINTS[hint_name]['description'] + f': {hint_results}')
 
+        if knowledge is not None and len(hints) > 0:
+            print('\nOpponents knowledge (estimated combinations left):')
+            for opponent, counts in enumerate(knowledge):
+                central = '' if players == 2 else f', {counts[0]} for the central tiles'
+                print(f'- #{opponent+1}: {counts[-1]} for your tiles{central}')
+
+        if deck is not None and deck[0] > 0:
+            print(f'\nHint cards: {deck[0]} face up, {deck[1]} used, {deck[2]} never seen')
+
         if len(simulations) == 0:
             print('\nNo simulation data (or the data is outdated)')
         else:
@@ -241,13 +276,38 @@ def display_main_menu(our_fcombination: Tuple[int, ...],
                       f'{ut.HINTS[simulation[0]]["description"]:<45}' +
                       f'{simulation[1][0]:<5.1%} ({simulation[1][1]:.1f})')
 
+        if dominated:
+            print('\nDominated hints (not simulated):')
+            for hint, other in dominated.items():
+                reason = 'reveals nothing' if other is None else f'no better than {ut.HINTS[other]["description"]}'
+                print(f'- {ut.HINTS[hint]["description"]:<45}{reason}')
+
+        if endgame is not None and endgame[2] is not None:
+            objective, cost, tree = endgame
+            if objective == 'worst':
+                print(f'\nEndgame plan (at most {cost:.0f} hints before guessing):')
+            else:
+                print(f'\nEndgame plan ({cost:.2f} hints on average before guessing):')
+            lines = tree_as_lines(tree, players)
+            print('\n'.join(lines[:TREE_LINES]))
+            if len(lines) > TREE_LINES:
+                print(f'  ... ({len(lines) - TREE_LINES} more lines)')
+
+        if guess is not None and guess[1] is not None and guess[1][1] is not None:
+            should_guess, (probability, fcombination), best = guess
+            print(f'\nMost likely combination: {ftiles_as_colored_tiles(fcombination)} ({probability:.1%} chance)')
+            if should_guess:
+                print('Advice: guess it now')
+            elif best is not None:
+                print(f'Advice: ask another hint ({best[1]:.1%} chance after {ut.HINTS[best[0]]["description"]})')
+
         print('\nOptions:')
         print(MAIN_MENU)
 
         if choice is not None:
             print(f'Error: There is no \'{choice}\' option')
         choice = input('Choose option: ')
-        if choice in ('h', 's', 'c', 'u', 'q'):
+        if choice in ('h', 's', 'c', 'u', 'p', 'q'):
             break
 
     return choice
@@ -282,8 +342,14 @@ def display_players_menu(players: int = 2) -> int | None:
         return choice-1
 
 
-def display_hints_menu(players: int = 2) -> Tuple[str, List[Tuple[int, int | str | Tuple[str, ...]]]] | None:
-    """Display the hints menu and return a valid hint and result."""
+def display_hints_menu(players: int = 2,
+                       get_answer_counts: Callable[[str], List[Dict[int | str | Tuple[str, ...], int]]] | None = None
+                       ) -> Tuple[str, List[Tuple[int, int | str | Tuple[str, ...]]]] | None:
+    """Display the hints menu and return a valid hint and result.
+
+    With the counts of the possible answers of every opponent to a hint, the possible answers are
+    listed before every answer is entered.
+    """
     opponents = list(range(players-1))
     if players == 3:
         player = display_players_menu(players)
@@ -303,86 +369,140 @@ def display_hints_menu(players: int = 2) -> Tuple[str, List[Tuple[int, int | str
         if choice in ut.HINTS or choice == 'q':
             break
 
+    answer_counts = None if get_answer_counts is None or choice == 'q' else get_answer_counts(choice)
     subchoices = []
     for opponent in opponents:
         subchoice = ''  # type: int | str | Tuple[str, ...]
 
         input_prefix = '' if players == 2 else f'Opponent #{opponent+1}: '
-        match choice:
-            case _ as choice if choice in ('st', 'sb', 'sw', 'sl', 'sr', 'sc',
-                                           'te', 'to', 'tb', 'tw', 'ts', 'd'):
-                while True:
-                    subchoice = input(input_prefix + ut.HINTS[choice]['description'] + ': ')
-                    try:
-                        subchoice = int(subchoice)
-                    except ValueError:
-                        print(f'Error: Value \'{subchoice}\' must be an integer')
-                        continue
-                    break
-            case _ as choice if choice in ('0', '1', '2', '3', '4', '5', '6', '7', '8', '9'):
-                while True:
-                    subchoice = input(input_prefix + f'Where are the #{choice} tiles? (e.g.: bc) '
-                                    '[leave empty if no tiles]: ').lower()
-                    if subchoice not in ('', 'a', 'b', 'c', 'd', 'e', 'ab', 'bc', 'cd', 'de'):
-                        print(f'Error: The position(s) \'{subchoice}\' is/are not valid')
-                        continue
-                    break
-            case 'nc':
-                while True:
-                    subchoice = input(input_prefix + 'Neighboring tile groups with same color (e.g.: ab de): ').lower()
-                    if subchoice.split() not in ([],
-                                                 ['ab'], ['bc'], ['cd'], ['de'],
-                                                 ['ab', 'cd'], ['ab', 'de'], ['bc', 'de'],
-                                                 ['abc'], ['bcd'], ['cde'],
-                                                 ['abc', 'de'], ['ab', 'cde'],
-                                                 ['abcd'], ['bcde'], ['abcde']):
-                        print(f'Error: The intervals(s) \'{subchoice}\' is/are not valid')
-                        continue
-                    subchoice = tuple(subchoice.split())
-                    break
-            case 'nn':
-                while True:
-                    subchoice = input(input_prefix + 'Neighboring tile groups with consecutive numbers '
-                                    '(e.g.: ab de): ').lower()
-                    if subchoice.split() not in ([],
-                                                 ['ab'], ['bc'], ['cd'], ['de'],
-                                                 ['ab', 'de'],
-                                                 ['abc'], ['bcd'], ['cde'],
-                                                 ['abcd'], ['bcde'], ['abcde']):
-                        print(f'Error: The intervals(s) \'{subchoice}\' is/are not valid')
-                        continue
-                    subchoice = tuple(subchoice.split())
-                    break
-            case 'c':
-                while True:
-                    subchoice = input(input_prefix + 'C tile is STRICTLY greater than 4 (y/n) : ').lower()
-                    if subchoice not in ('y', 'n'):
-                        print('Error: You must answer \'y\' or \'n\'')
-                        continue
-                    break
-            case 'q':
-                return None
+        possible = None if answer_counts is None else answer_counts[opponent]
+        if possible is not None:
+            print(input_prefix + 'Possible answers (combinations left): ' +
+                  ', '.join(f'{hint_result_as_str(answer)} ({count})' for answer, count in sorted(possible.items())))
+
+        rejected = None  # type: int | str | Tuple[str, ...] | None
+        while True:
+            match choice:
+                case _ as choice if choice in ('st', 'sb', 'sw', 'sl', 'sr', 'sc',
+                                               'te', 'to', 'tb', 'tw', 'ts', 'd'):
+                    while True:
+                        subchoice = input(input_prefix + ut.HINTS[choice]['description'] + ': ')
+                        try:
+                            subchoice = int(subchoice)
+                        except ValueError:
+                            print(f'Error: Value \'{subchoice}\' must be an integer')
+                            continue
+                        break
+                case _ as choice if choice in ('0', '1', '2', '3', '4', '5', '6', '7', '8', '9'):
+                    while True:
+                        subchoice = input(input_prefix + f'Where are the #{choice} tiles? (e.g.: bc) '
+                                        '[leave empty if no tiles]: ').lower()
+                        if subchoice not in ('', 'a', 'b', 'c', 'd', 'e', 'ab', 'bc', 'cd', 'de'):
+                            print(f'Error: The position(s) \'{subchoice}\' is/are not valid')
+                            continue
+                        break
+                case 'nc':
+                    while True:
+                        subchoice = input(input_prefix + 'Neighboring tile groups with same color (e.g.: ab de): ').lower()
+                        if subchoice.split() not in ([],
+                                                     ['ab'], ['bc'], ['cd'], ['de'],
+                                                     ['ab', 'cd'], ['ab', 'de'], ['bc', 'de'],
+                                                     ['abc'], ['bcd'], ['cde'],
+                                                     ['abc', 'de'], ['ab', 'cde'],
+                                                     ['abcd'], ['bcde'], ['abcde']):
+                            print(f'Error: The intervals(s) \'{subchoice}\' is/are not valid')
+                            continue
+                        subchoice = tuple(subchoice.split())
+                        break
+                case 'nn':
+                    while True:
+                        subchoice = input(input_prefix + 'Neighboring tile groups with consecutive numbers '
+                                        '(e.g.: ab de): ').lower()
+                        if subchoice.split() not in ([],
+                                                     ['ab'], ['bc'], ['cd'], ['de'],
+                                                     ['ab', 'de'],
+                                                     ['abc'], ['bcd'], ['cde'],
+                                                     ['abcd'], ['bcde'], ['abcde']):
+                            print(f'Error: The intervals(s) \'{subchoice}\' is/are not valid')
+                            continue
+                        subchoice = tuple(subchoice.split())
+                        break
+                case 'c':
+                    while True:
+                        subchoice = input(input_prefix + 'C tile is STRICTLY greater than 4 (y/n) : ').lower()
+                        if subchoice not in ('y', 'n'):
+                            print('Error: You must answer \'y\' or \'n\'')
+                            continue
+                        break
+                case 'q':
+                    return None
+
+            # An answer that no combination gives is only applied once it is entered twice
+            if possible is None or subchoice in possible or subchoice == rejected:
+                break
+            print(f'Error: No combination left gives \'{hint_result_as_str(subchoice)}\', '
+                  'enter it again to apply it anyway')
+            rejected = subchoice
 
         subchoices.append((opponent, subchoice))
 
     return (choice, subchoices)
 
 
-def display_combinations_menu(opponent_fcombinations: List[Tuple[int, ...]]) -> None:
-    """Display the combinations menu."""
+def display_combinations_menu(browser: 'br.Browser') -> None:
+    """Display the combinations menu, page by page."""
+    error = None
     while True:
         clear_screen()
         print(TITLE)
-        remaining = len(opponent_fcombinations)
-        print(f'There are {remaining} combinations remaining', end='')
-        if remaining < 20:
-            print(':')
-        else:
-            print(' (showing only 20 of them):')
-        for fcombination in opponent_fcombinations[:min(remaining, 20)]:
-            print(ftiles_as_colored_tiles(fcombination))
-        input('\nPress \'[Enter]\' to go back.')
-        break
+        page = browser.get_page()
+        matching = f' matching \'{browser.query}\'' if browser.query else ''
+        print(f'There are {browser.count()} combinations remaining{matching}, the most likely first '
+              f'(page {browser.page + 1} of {browser.pages()}):')
+        for fcombination, likelihood in page:
+            print(f'{ftiles_as_colored_tiles(fcombination)}  {likelihood:.1%}')
+        print(COMBINATIONS_MENU)
+
+        if error is not None:
+            print(f'Error: {error}')
+            error = None
+        choice = input('Choose option: ')
+        match choice:
+            case 'n':
+                browser.page = min(browser.page + 1, browser.pages() - 1)
+            case 'p':
+                browser.page = max(browser.page - 1, 0)
+            case 'f':
+                try:
+                    browser.filter(input('Filter (e.g.: b=7b 5g -3w, empty for all): '))
+                except ValueError as exception:
+                    error = str(exception)
+            case 'q':
+                break
+            case _:
+                error = f'There is no \'{choice}\' option'
+
+
+def display_conflict_menu(hints: List[Tuple[str, List[Tuple[int, str, int]]]],
+                          conflict: List[Tuple[int, int, int | str | Tuple[str, ...]]],
+                          players: int = 2) -> int | None:
+    """Display the answers that cannot all be true and return the index of the hint to remove, or None to keep them."""
+    indices = sorted({index for index, _, _ in conflict})
+    choice = None
+    while True:
+        clear_screen()
+        print(TITLE)
+        print('Error: These answers cannot all be true, one of them must be wrong:')
+        for index, opponent, answer in conflict:
+            prefix = '' if players == 2 else f'#{opponent+1} '
+            print(f'({index+1}) {ut.HINTS[hints[index][0]]["description"]:<45}{prefix}{hint_result_as_str(answer)}')
+        if choice is not None:
+            print(f'\nError: There is no \'{choice}\' option')
+        choice = input('\nEnter the number of the hint to remove, or press \'[Enter]\' to keep them: ')
+        if choice == '':
+            return None
+        if choice.isdigit() and int(choice) - 1 in indices:
+            return int(choice) - 1
 
 
 def display_simulation_menu(players: int = 2) -> Tuple[str, ...] | None:
@@ -394,7 +514,7 @@ def display_simulation_menu(players: int = 2) -> Tuple[str, ...] | None:
         print(get_hint_shortcuts(players))
         if wrong_hint is not None:
             print(f'Error: The hint \'{wrong_hint}\' is not a valid hint')
-        choice = input('Choose the hints you want to simulate, separated by spaces (e.g., st tw nc): ')
+        choice = input('Choose the hints face up you want to simulate, separated by spaces (e.g., st tw nc): ')
         if choice == 'q':
             return None
         for hint in choice.split():
@@ -403,3 +523,49 @@ def display_simulation_menu(players: int = 2) -> Tuple[str, ...] | None:
                 break
         else:
             return tuple(choice.split())
+
+
+def display_profiling_menu(enabled: bool,
+                           stats: Dict[str, Dict[str, float | int | Dict[str, int]]],
+                           export_json: Callable[[str], None],
+                           title: str = TITLE) -> None:
+    """Display the profiling data of the board operations and export them on demand."""
+    clear_screen()
+    print(title)
+    if not enabled:
+        print('Profiling is disabled, start the program with --profile '
+              'or set the BREAK_THE_CODE_PROFILE environment variable')
+        input('\nPress \'[Enter]\' to go back.')
+        return
+
+    if len(stats) == 0:
+        print('No profiling data yet')
+    else:
+        print(f'{"Operation":<24}{"Calls":>8}{"Total":>12}{"Max":>12}{"In":>12}{"Out":>12}   Hint calls')
+        for operation, data in sorted(stats.items(), key=lambda s: s[1]['seconds'], reverse=True):
+            hint_calls = ', '.join(f'{hint} {calls}' for hint, calls in data['hint_calls'].items())
+            print(f'{operation:<24}{data["calls"]:>8}'
+                  f'{data["seconds"] * 1000:>9.1f} ms{data["max_seconds"] * 1000:>9.1f} ms'
+                  f'{data["candidates_in"]:>12}{data["candidates_out"]:>12}   {hint_calls or "-"}')
+
+    while True:
+        path = input('\nEnter a file name to export the data as JSON [leave empty to go back]: ')
+        if len(path) == 0:
+            return
+        try:
+            export_json(path)
+        except OSError as error:
+            print(f'Error: {error}')
+            continue
+        print(f'Profiling data exported to {path}')
+        return
+
+
+def display_startup_profile(profile_startup: Callable[[int], List[Tuple[str, float]]]) -> None:
+    """Display the time of each startup step for every hand size."""
+    print(TITLE)
+    for players in (3, 4):
+        print(f'Hands of {5 if players < 4 else 4} tiles:')
+        for step, seconds in profile_startup(players):
+            print(f'- {step:<40}{seconds * 1000:>8.1f} ms')
+        print()
@@ -0,0 +1,167 @@
+"""Opt-in instrumentation of the board operations.
+
+The board methods are only wrapped while profiling is enabled, so that it costs nothing otherwise.
+Profiling is enabled with the `BREAK_THE_CODE_PROFILE` environment variable or the `--profile` flag
+of the programs.
+"""
+
+
+from typing import Callable, Dict, List, Tuple
+import collections
+import functools
+import json
+import os
+import time
+
+
+ENVIRONMENT_VARIABLE = 'BREAK_THE_CODE_PROFILE'
+
+# Number of calls kept in the log of the most recent operations
+LOG_SIZE = 200
+
+_originals = {}  # type: Dict[str, Callable]
+_stats = {}  # type: Dict[str, Dict[str, float | int | Dict[str, int]]]
+_log = collections.deque(maxlen=LOG_SIZE)
+_stack = []  # type: List[collections.Counter]
+
+
+def is_requested() -> bool:
+    """Return whether profiling is requested by the environment."""
+    return os.environ.get(ENVIRONMENT_VARIABLE, '') not in ('', '0')
+
+
+def is_enabled() -> bool:
+    """Return whether the board operations are instrumented."""
+    return len(_originals) > 0
+
+
+def _count(board) -> int:
+    """Return the total number of candidates of a board."""
+    return sum(board.get_fcombinations_counts())
+
+
+def _measure_init(args: tuple, result: object, before: int) -> Tuple[int, int, Dict[str, int]]:
+    """Return the candidates in and out, and the hint calls of a board creation."""
+    return 0, _count(args[0]), {}
+
+
+def _measure_filter(args: tuple, result: object, before: int) -> Tuple[int, int, Dict[str, int]]:
+    """Return the candidates in and out, and the hint calls of a hint filter."""
+    return args[1].bit_count(), result.bit_count(), {args[2]: 1}
+
+
+def _measure_known_tiles(args: tuple, result: object, before: int) -> Tuple[int, int, Dict[str, int]]:
+    """Return the candidates in and out, and the hint calls of a filter against target fcombinations."""
+    return args[1].bit_count(), result.bit_count(), {}
+
+
+def _measure_simulate(args: tuple, result: object, before: int) -> Tuple[int, int, Dict[str, int]]:
+    """Return the candidates in and out, and the hint calls of a simulation."""
+    candidates = sum(args[0].get_fcombinations_counts()[1:])
+    return candidates, candidates, {args[1]: candidates}
+
+
+def _measure_apply_hint(args: tuple, result: object, before: int) -> Tuple[int, int, Dict[str, int]]:
+    """Return the candidates in and out, and the hint calls of a hint."""
+    return before, _count(args[0]), {}
+
+
+def _record(operation: str,
+            seconds: float,
+            candidates_in: int,
+            candidates_out: int,
+            hint_calls: collections.Counter) -> None:
+    """Add a call to the statistics of an operation."""
+    stats = _stats.setdefault(operation, {'calls': 0,
+                                          'seconds': 0.0,
+                                          'max_seconds': 0.0,
+                                          'candidates_in': 0,
+                                          'candidates_out': 0,
+                                          'hint_calls': {}})
+    stats['calls'] += 1
+    stats['seconds'] += seconds
+    stats['max_seconds'] = max(stats['max_seconds'], seconds)
+    stats['candidates_in'] += candidates_in
+    stats['candidates_out'] += candidates_out
+    for hint, calls in hint_calls.items():
+        stats['hint_calls'][hint] = stats['hint_calls'].get(hint, 0) + calls
+    if len(_stack) == 0:
+        _log.append({'operation': operation,
+                     'seconds': seconds,
+                     'candidates_in': candidates_in,
+                     'candidates_out': candidates_out,
+                     'hint_calls': dict(hint_calls)})
+
+
+def _instrument(operation: str, method: Callable) -> Callable:
+    """Return the method wrapped to record its statistics."""
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        before = _count(args[0]) if operation in ('apply_hint', 'apply_hints') else 0
+        _stack.append(collections.Counter())
+        start = time.perf_counter()
+        try:
+            result = method(*args, **kwargs)
+        finally:
+            seconds = time.perf_counter() - start
+            hint_calls = _stack.pop()
+        candidates_in, candidates_out, own_calls = MEASURES[operation](args, result, before)
+        hint_calls.update(own_calls)
+        # The hint calls of nested operations are also counted in the outer ones
+        for counter in _stack:
+            counter.update(hint_calls)
+        _record(operation, seconds, candidates_in, candidates_out, hint_calls)
+        return result
+    return wrapper
+
+
+MEASURES = {'__init__': _measure_init,
+            'apply_hint': _measure_apply_hint,
+            'apply_hints': _measure_apply_hint,
+            '_filter_unsupported': _measure_known_tiles,
+            '_filter_combinations': _measure_filter,
+            '_filter_known_tiles': _measure_known_tiles,
+            'simulate': _measure_simulate,
+            'simulate_joint': _measure_simulate,
+            'simulate_central': _measure_simulate}
+
+
+def enable() -> None:
+    """Instrument the board operations."""
+    import engine.board as bd
+
+    for operation in MEASURES:
+        if operation not in _originals:
+            _originals[operation] = getattr(bd.Board, operation)
+            setattr(bd.Board, operation, _instrument(operation, _originals[operation]))
+
+
+def disable() -> None:
+    """Remove the instrumentation of the board operations."""
+    import engine.board as bd
+
+    for operation, method in _originals.items():
+        setattr(bd.Board, operation, method)
+    _originals.clear()
+
+
+def reset() -> None:
+    """Forget the recorded statistics."""
+    _stats.clear()
+    _log.clear()
+
+
+def get_stats() -> Dict[str, Dict[str, float | int | Dict[str, int]]]:
+    """Return the statistics of every operation."""
+    return {operation: dict(stats, hint_calls=dict(stats['hint_calls'])) for operation, stats in _stats.items()}
+
+
+def get_log() -> List[Dict[str, float | int | Dict[str, int]]]:
+    """Return the most recent top-level operations, oldest first."""
+    return list(_log)
+
+
+def export_json(path: str) -> None:
+    """Export the statistics and the log of the most recent operations to a JSON file."""
+    with open(path, 'w', encoding='utf-8') as json_file:
+        json.dump({'stats': get_stats(), 'log': get_log()}, json_file, indent=2)
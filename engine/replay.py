@@ -0,0 +1,119 @@
+"""Replay recorded games through the engine.
+
+A game record is one JSON object per line:
+
+    {"players": 3,
+     "tiles": ["1b", "2w", "5g", "7b", "9w"],
+     "hints": [{"hint": "st", "answers": [[0, 20], [1, 22]]},
+               {"hint": "nc", "player": 0, "answers": [[1, ["ab", "de"]]]},
+               {"hint": "5", "available": ["5", "st", "tb"], "answers": [[0, "c"], [1, ""]]}]}
+
+The opponents are numbered from 0 like in the helper, and the `player` who asked a hint is -1 (us)
+when missing. The `available` hints default to all the hints.
+"""
+
+
+from typing import Dict, Iterable, Iterator, TextIO
+import collections
+import json
+import multiprocessing
+
+import engine.combination as cb
+import engine.export as ex
+import engine.journal as jn
+import engine.session as ss
+import engine.utils as ut
+
+
+def read_records(lines: Iterable[str]) -> Iterator[Dict]:
+    """Yield the game records of JSON lines, skipping the blank ones."""
+    for line in lines:
+        if line.strip():
+            yield json.loads(line)
+
+
+def replay_record(record: Dict, export: bool = False) -> Dict:
+    """Rebuild a game and return the candidates and the recommended hint of every move.
+
+    When exporting, every move also holds the masks of the board it was played on with the
+    simulations of our moves, and the game the masks of the final board.
+    """
+    players = record['players']
+    tiles = ['5g' if tile == '5' else tile for tile in record['tiles']]
+    session = ss.HelperSession(cb.combination_to_fcombination(tuple(tiles)), players)
+
+    moves = []
+    for move in record['hints']:
+        hint = move['hint']
+        player = move.get('player', -1)
+        recommended, played_rank, simulations = None, None, []
+        masks = session.board.get_masks()
+        if player == -1:
+            available = tuple(move.get('available', ut.HINTS))
+            simulations = ss.sort_simulations([(h, ss.simulate_hint(session.board, h)) for h in available])
+            recommended = simulations[0][0]
+            ranking = [simulation[0] for simulation in simulations]
+            played_rank = ranking.index(hint) + 1 if hint in ranking else None
+
+        session.apply_hint(hint, [(opponent, jn.parse_answer(answer)) for opponent, answer in move['answers']])
+        moves.append({'hint': hint,
+                      'player': player,
+                      'candidates': session.board.get_fcombinations_counts(),
+                      'recommended': recommended,
+                      'played_rank': played_rank})
+        if export:
+            moves[-1] |= {'masks': masks, 'simulations': simulations}
+
+    game = {'id': record.get('id'), 'players': players, 'moves': moves}
+    if export:
+        game['masks'] = session.board.get_masks()
+    return game
+
+
+def replay(records: Iterable[Dict], workers: int = 1, window: int = 64, export: bool = False) -> Iterator[Dict]:
+    """Yield the replay of every record in order, with at most `window` records in flight per worker."""
+    if workers < 2:
+        yield from (replay_record(record, export) for record in records)
+        return
+
+    with multiprocessing.Pool(workers) as pool:
+        pending = collections.deque()
+        for record in records:
+            pending.append(pool.apply_async(replay_record, (record, export)))
+            if len(pending) >= window * workers:
+                yield pending.popleft().get()
+        while pending:
+            yield pending.popleft().get()
+
+
+def export_replays(replays: Iterable[Dict], exporter: ex.Exporter) -> Iterator[Dict]:
+    """Append the boards of every move of the replays to an export, and yield the replays without them."""
+    for game in replays:
+        label = '' if game['id'] is None else str(game['id'])
+        for hints, move in enumerate(game['moves']):
+            exporter.add_masks(move.pop('masks'), game['players'], hints, label, move.pop('simulations'))
+        exporter.add_masks(game.pop('masks'), game['players'], len(game['moves']), label)
+        yield game
+
+
+def summarize(replays: Iterable[Dict], output: TextIO | None = None) -> Dict[str, float | int]:
+    """Consume the replays, writing them as JSON lines if requested, and return a summary."""
+    games, moves, our_moves, agreements, ranked, rank_sum = 0, 0, 0, 0, 0, 0
+    for game in replays:
+        if output is not None:
+            output.write(json.dumps(game) + '\n')
+        games += 1
+        for move in game['moves']:
+            moves += 1
+            if move['recommended'] is None:
+                continue
+            our_moves += 1
+            agreements += move['hint'] == move['recommended']
+            if move['played_rank'] is not None:
+                ranked += 1
+                rank_sum += move['played_rank']
+    return {'games': games,
+            'moves': moves,
+            'our_moves': our_moves,
+            'agreement': agreements / our_moves if our_moves > 0 else 0.0,
+            'average_rank': rank_sum / ranked if ranked > 0 else 0.0}
@@ -0,0 +1,692 @@
+"""Game sessions without any input or output."""
+
+
+from typing import Callable, Dict, Iterable, List, Set, Tuple
+import itertools
+import random
+
+import engine.board as bd
+import engine.combination as cb
+import engine.deck as dk
+import engine.knowledge as kn
+import engine.simulations as sm
+import engine.solver as sv
+import engine.states as bs
+import engine.utils as ut
+
+
+bk = ut.lazy_import('engine.book')
+br = ut.lazy_import('engine.browser')
+ex = ut.lazy_import('engine.export')
+jn = ut.lazy_import('engine.journal')
+
+WINNING_MOVE = '✅ Win'
+LOSING_MOVE = '❌ Lose'
+ENDING_MOVES = (WINNING_MOVE, LOSING_MOVE)
+
+# Least win probability of a guess when no hint tells anything more
+GUESS_FLOOR = 0.5
+
+# The scorings are kept with the constants, so that the frontends parse them without the engine
+SCORINGS = ut.SCORINGS
+
+
+def sort_simulations(simulations: List[Tuple[str, Tuple[float, float]]]) -> List[Tuple[str, Tuple[float, float]]]:
+    """Return the simulations sorted from the best hint to the worst one."""
+    return sorted(simulations, key=lambda s: (round(s[1][0], 2), -s[1][1]), reverse=True)
+
+
+def simulate_hint(board: bd.Board,
+                  hint: str,
+                  scoring: str = 'opponents',
+                  knowledge: Tuple[bd.Board, int, Tuple[int, ...]] | None = None,
+                  deck: dk.Deck | None = None) -> Tuple[float, float]:
+    """Return the simulation of a hint on a board with one of the SCORINGS, from the cache of simulations if possible.
+
+    The knowledge scoring needs the public board, the player asking the hint and their tiles, and
+    the deck scoring needs the hint cards of the game.
+    """
+    # Boards of the same masks filter them differently when our tiles hold another number of 5 tiles
+    key = (scoring, hint, board._free_fives)  # type: Tuple
+    match scoring:
+        case 'knowledge':
+            public, player, fcombination = knowledge
+            key += (public.get_masks(), player, tuple(fcombination))
+        case 'deck':
+            key += (tuple(sorted(deck.face_up)), tuple(deck.get_remaining()))
+    masks = board.get_masks()
+    simulation = sm.get(masks, key)
+    if simulation is None:
+        simulation = _simulate_hint(board, hint, scoring, knowledge, deck)
+        sm.put(masks, key, simulation)
+    return simulation
+
+
+def _simulate_hint(board: bd.Board,
+                   hint: str,
+                   scoring: str = 'opponents',
+                   knowledge: Tuple[bd.Board, int, Tuple[int, ...]] | None = None,
+                   deck: dk.Deck | None = None) -> Tuple[float, float]:
+    """Return the simulation of a hint on a board with one of the SCORINGS."""
+    match scoring:
+        case 'joint':
+            return board.simulate_joint(hint)
+        case 'central':
+            return board.simulate_central(hint)
+        case 'knowledge':
+            public, player, fcombination = knowledge
+            mean, stdev = board.simulate_central(hint)
+            return mean - kn.simulate_others(public, hint, player, fcombination), stdev
+        case 'deck':
+            return dk.simulate_card(board, hint, deck.face_up, deck.get_remaining())
+        case _:
+            return board.simulate(hint)
+
+
+def simulate_sampled(board: bd.Board,
+                     hints: Tuple[str, ...],
+                     time_budget: float) -> List[Tuple[str, Tuple[float, float]]]:
+    """Return the sampled simulations of the hints, best first, with the half-width of the confidence intervals in %."""
+    estimates = board.simulate_sampled(tuple(hints), time_budget)
+    return sort_simulations([(hint, (mean, half_width * 100)) for hint, (mean, half_width, _) in estimates.items()])
+
+
+def prune_hints(board: bd.Board,
+                hints: Tuple[str, ...],
+                scoring: str = 'opponents') -> Tuple[Tuple[str, ...], Dict[str, str | None]]:
+    """Return the hints worth simulating on a board with a scoring, and the others with the hint dominating them.
+
+    A dominated hint reveals nothing that the hint dominating it does not. With the knowledge
+    scoring, which also counts what the answers teach the opponents, revealing less can be worth it,
+    so no hint is left out. If every hint reveals nothing, the first one is kept.
+    """
+    if scoring == 'knowledge' or len(hints) < 2:
+        return tuple(hints), {}
+    dominated = board.get_dominated(tuple(hints))
+    kept = tuple(hint for hint in dict.fromkeys(hints) if hint not in dominated) or tuple(hints[:1])
+    return kept, {hint: other for hint, other in dominated.items() if hint not in kept}
+
+
+def get_guess_risk(target_counts: List[int]) -> float:
+    """Return the probability that an opponent guesses right before our next turn, from the numbers of combinations they have left.
+
+    Every opponent is assumed to guess one of the combinations they have left, each as likely.
+    """
+    safe = 1
+    for count in target_counts:
+        if count > 0:
+            safe *= 1 - 1 / count
+    return 1 - safe
+
+
+def get_best_hint(board: bd.Board, hints: Iterable[str]) -> Tuple[str, float] | None:
+    """Return the hint with the highest expected win probability once answered, with that probability, or None without hints."""
+    best = None
+    for hint in hints:
+        after = board.get_hint_win_probability(hint)
+        if best is None or after > best[1]:
+            best = (hint, after)
+    return best
+
+
+def decide_guess(board: bd.Board,
+                 hints: Tuple[str, ...],
+                 get_risk: Callable[[], float] | None = None,
+                 later: Tuple[str, ...] = ()) -> Tuple[bool,
+                                                       Tuple[float, Tuple[int, ...] | None] | None,
+                                                       Tuple[str, float] | None]:
+    """Return whether to guess now, the win probability with the most likely combination, and the best hint with its win probability.
+
+    Asking a hint is worth the expected win probability of guessing once it is answered, if no
+    opponent guessed right in the meantime, with the risk only computed when the choice depends on
+    it. The later cards, which can come face up, are worth as much a turn later. A wrong guess
+    knocks the player out while a useless hint only costs a turn, so guessing has to be worth more
+    than going on, and at least GUESS_FLOOR when no hint tells anything more. The probabilities are
+    None when there are too many joint deals to count them, and then there is no point in guessing
+    yet.
+    """
+    win = board.get_win_probability()
+    if win is None:
+        return False, None, None
+    best = get_best_hint(board, hints)
+    probability = win[0]
+    if probability in (0, 1) or best is None:
+        return probability == 1, win, best
+
+    safe = None
+    if best[1] > probability:
+        safe = 1 - (0 if get_risk is None else get_risk())
+        best = (best[0], safe * best[1])
+        if best[1] >= probability:
+            return False, win, best
+    # The cards face up are not worth more than guessing now, but the later ones may be
+    later_best = get_best_hint(board, (hint for hint in later if hint not in hints))
+    if later_best is not None and later_best[1] > probability:
+        if safe is None:
+            safe = 1 - (0 if get_risk is None else get_risk())
+        return probability > safe * safe * later_best[1], win, best
+    if safe is None:
+        # No hint tells anything more
+        return probability >= GUESS_FLOOR, win, best
+    return True, win, best
+
+
+class HelperSession:
+    """Keep track of the hints of a game played with the helper."""
+
+    def __init__(self,
+                 fcombination: Tuple[int, ...],
+                 players: int = 2,
+                 time_budget: float | None = None,
+                 scoring: str = 'opponents',
+                 endgame: str = 'expected') -> None:
+        """Start a new game with our tiles, ranking the hints by sampling deals when given a time budget in seconds.
+
+        The endgame is solved by minimising one of the solver OBJECTIVES.
+        """
+        self.fcombination = fcombination
+        self.players = players
+        self.time_budget = time_budget
+        self.scoring = scoring
+        self.endgame = endgame
+        self.board = bd.Board(fcombination, players)
+        self.key = bs.get_root_key(fcombination, players)
+        # The answers of the opponents are public, as well as ours, with us as the last player
+        self.public_history = []  # type: List[Tuple[str, List[Tuple[int, int | str | Tuple[str, ...]]]]]
+        self.hints = []  # type: List[Tuple[str, List[Tuple[int, int | str | Tuple[str, ...], int]]]]
+        self.simulations = []  # type: List[Tuple[str, Tuple[float, float]]]
+        # Hints left out of the simulations, with the hint dominating them or None if they reveal nothing
+        self.dominated = {}  # type: Dict[str, str | None]
+        # Simulations and dominated hints before every recorded hint, by number of hints
+        self._rankings = {}  # type: Dict[int, Tuple[List[Tuple[str, Tuple[float, float]]], Dict[str, str | None]]]
+        self.deck = dk.Deck()
+        # Boards and their keys before every recorded hint, which share their unchanged masks
+        self._boards = []  # type: List[Tuple[bd.Board, str]]
+        self.journal = None  # type: jn.Journal | None
+        self.exporter = None  # type: ex.Exporter | None
+
+    def _record(self, event: Dict) -> None:
+        """Append an event to the journal of the session, if any."""
+        if self.journal is not None:
+            self.journal.record(event)
+
+    def _export(self) -> None:
+        """Append the board and its simulations to the export of the session, if any."""
+        if self.exporter is not None:
+            self.exporter.add_board(self.board, self.players, len(self.hints), 'helper', self.simulations)
+            self.exporter.flush()
+
+    def _rebuild_boards(self) -> None:
+        """Rebuild the boards before every recorded hint from the cached states."""
+        self.board, self.key = bd.Board(self.fcombination, self.players), bs.get_root_key(self.fcombination, self.players)
+        self._boards = []
+        for hint, results in self.hints:
+            self._boards.append((self.board, self.key))
+            self.board, self.key = bs.with_hint(self.board, self.key, hint,
+                                                [(opponent, answer) for opponent, answer, _ in results])
+
+    def apply_hint(self,
+                   hint: str,
+                   answers: List[Tuple[int, int | str | Tuple[str, ...]]]) -> List[Tuple[int, int | str | Tuple[str, ...], int]]:
+        """Apply the answers of the opponents to a hint and return them with the number of filtered combinations."""
+        hint_results = self._apply_hint(hint, answers)
+        self._record({'event': 'hint', 'hint': hint, 'answers': answers})
+        self._export()
+        return hint_results
+
+    def _apply_hint(self,
+                    hint: str,
+                    answers: List[Tuple[int, int | str | Tuple[str, ...]]]) -> List[Tuple[int, int | str | Tuple[str, ...], int]]:
+        """Apply the answers of the opponents to a hint without recording it, and return them with the number of filtered combinations."""
+        num_opponent_combs_before = self.board.get_fcombinations_counts()[1:]
+        self._boards.append((self.board, self.key))
+        self.board, self.key = bs.with_hint(self.board, self.key, hint, answers)
+        public_answers = list(answers)
+        # We answer every hint with 4 players, and the hints of the opponents with 3 players
+        if self.players == 4 or (self.players == 3 and len(answers) < 2):
+            public_answers.append((self.players - 1, ut.HINTS[hint]['function'](self.fcombination)))
+        self.public_history.append((hint, public_answers))
+        self.deck.use(hint)
+
+        num_opponent_combs_after = self.board.get_fcombinations_counts()[1:]
+        hint_results = []
+        for opponent, answer in answers:
+            improvement = num_opponent_combs_before[opponent] - num_opponent_combs_after[opponent]
+            hint_results.append((opponent, answer, improvement))
+
+        self._rankings[len(self.hints)] = (self.simulations, self.dominated)
+        self.hints.append((hint, hint_results))
+        self.simulations, self.dominated = [], {}
+        return hint_results
+
+    def undo(self) -> bool:
+        """Remove the last hint and return whether there was one."""
+        if len(self.hints) == 0:
+            return False
+        if len(self._boards) < len(self.hints):
+            # The boards before the checkpoint of a resumed game are only rebuilt when needed
+            self._rebuild_boards()
+        self.hints.pop()
+        # The simulations of the previous board come back, unless it was restored from a checkpoint
+        self.simulations, self.dominated = self._rankings.pop(len(self.hints), ([], {}))
+        self.board, self.key = self._boards.pop()
+        self.public_history.pop()
+        self.deck.unuse()
+        self._record({'event': 'undo'})
+        return True
+
+    def remove_hint(self, index: int) -> bool:
+        """Remove a recorded hint by its index, keeping the hints after it, and return whether there was one."""
+        if not 0 <= index < len(self.hints):
+            return False
+        if len(self._boards) < len(self.hints):
+            self._rebuild_boards()
+        later = self.hints[index + 1:]
+        self.board, self.key = self._boards[index]
+        del self.hints[index:], self._boards[index:], self.public_history[index:], self.deck.used[index:]
+        # The board before the removed hint gets its rankings back, instead of those of the last board
+        self.simulations, self.dominated = self._rankings.get(index, ([], {}))
+        self._rankings = {count: ranking for count, ranking in self._rankings.items() if count < index}
+        for hint, results in later:
+            self._apply_hint(hint, [(opponent, answer) for opponent, answer, _ in results])
+        self._record({'event': 'remove', 'index': index})
+        self._export()
+        return True
+
+    def find_conflict(self) -> List[Tuple[int, int, int | str | Tuple[str, ...]]]:
+        """Return a minimal set of recorded answers that cannot all be true, or an empty list if there is none.
+
+        Every answer is returned as the index of its hint, the opponent and the answer. The conflicting
+        answers are found one by one, latest first: the next one is the earliest answer that is
+        inconsistent with the answers before it and those already found, by a binary search over the
+        boards before every hint, which holds since adding answers only removes combinations. Leaving
+        out any answer of the set makes the others consistent, although a smaller set may exist. It
+        only takes a few boards per answer instead of replaying the game.
+        """
+        if self.board.is_consistent():
+            return []
+        if len(self._boards) < len(self.hints):
+            self._rebuild_boards()
+        boards = [board for board, _ in self._boards] + [self.board]
+        answers = [(index, opponent, answer) for index, (_, results) in enumerate(self.hints)
+                   for opponent, answer, _ in results]
+        starts = list(itertools.accumulate((len(results) for _, results in self.hints), initial=0))
+
+        def is_consistent(count: int, conflict: List[Tuple[int, int, int | str | Tuple[str, ...]]]) -> bool:
+            """Return whether the first answers are consistent with the conflicting answers found so far."""
+            index = answers[count][0] if count < len(answers) else len(self.hints)
+            board = boards[index]
+            if count > starts[index]:
+                hint, results = self.hints[index]
+                board = board.with_hint(hint, [(opponent, answer) for opponent, answer, _ in results[:count - starts[index]]])
+            for hint_index, opponent, answer in conflict:
+                board = board.with_hint(self.hints[hint_index][0], [(opponent, answer)])
+            return board.is_consistent()
+
+        conflict = []  # type: List[Tuple[int, int, int | str | Tuple[str, ...]]]
+        limit = len(answers)
+        while limit > 0 and is_consistent(0, conflict):
+            low, high = 0, limit
+            while low < high:
+                middle = (low + high) // 2
+                if is_consistent(middle, conflict):
+                    low = middle + 1
+                else:
+                    high = middle
+            conflict.append(answers[high - 1])
+            limit = high - 1
+        return sorted(conflict)
+
+    def show_cards(self, cards: Tuple[str, ...]) -> None:
+        """Record the hint cards face up."""
+        self.deck.show(cards)
+        self._record({'event': 'cards', 'cards': list(cards)})
+
+    def simulate(self, hints: Tuple[str, ...]) -> List[Tuple[str, Tuple[float, float]]]:
+        """Simulate the given hints face up, along with those simulated before, and return all the simulations, best first.
+
+        The hints dominated by another one are not simulated, but kept in dominated.
+        """
+        # Only the given hints are face up, the others were simulated before
+        self.show_cards(hints)
+        hints = tuple(dict.fromkeys(tuple(simulation[0] for simulation in self.simulations) +
+                                    tuple(self.dominated) + tuple(hints)))
+        if self.scoring == 'deck':
+            # The other cards face up change the simulations of the hints simulated before
+            self.simulations = []
+        hints, self.dominated = prune_hints(self.board, hints, self.scoring)
+        self.simulations = [simulation for simulation in self.simulations if simulation[0] in hints]
+        if self.time_budget is not None:
+            self.simulations = simulate_sampled(self.board, hints, self.time_budget)
+            self._export()
+            return self.simulations
+
+        simulated = [simulation[0] for simulation in self.simulations]
+        knowledge = None
+        if self.scoring == 'knowledge':
+            knowledge = (kn.get_board(self.players, self.public_history), self.players - 1, self.fcombination)
+        if len(self.hints) == 0 and self.scoring == 'opponents':
+            # The opening book ranks the hints of the initial board
+            opening = bk.get_simulations(self.fcombination, self.players, hints)
+            if opening is not None:
+                self.simulations = opening
+                self._export()
+                return self.simulations
+        for hint in hints:
+            if hint not in simulated:
+                self.simulations.append((hint, simulate_hint(self.board, hint, self.scoring, knowledge, self.deck)))
+                simulated.append(hint)
+        self.simulations = sort_simulations(self.simulations)
+        self._export()
+        return self.simulations
+
+    def solve(self) -> Tuple[float, sv.Node | None] | None:
+        """Return the least number of simulated hints needed to know the central tiles with the decision tree, or None if there are too many deals."""
+        if len(self.simulations) == 0:
+            return None
+        return sv.solve(self.board, tuple(hint for hint, _ in self.simulations), self.endgame)
+
+    def knowledge(self) -> List[Tuple[int, ...]]:
+        """Return the number of central fcombinations and of fcombinations of every player, as every opponent sees them.
+
+        The last count is the number of fcombinations that the opponent has for our tiles.
+        """
+        public = kn.get_board(self.players, self.public_history)
+        return [kn.get_view_counts(public, opponent, self.board.get_held_exclusion_mask(opponent))
+                for opponent in range(self.players - 1)]
+
+    def guess(self) -> Tuple[bool, Tuple[float, Tuple[int, ...] | None] | None, Tuple[str, float] | None]:
+        """Return whether to guess now rather than ask one of the simulated hints, as decide_guess."""
+        # The opponents guess our tiles with 2 players, and the central tiles otherwise
+        return decide_guess(self.board, tuple(hint for hint, _ in self.simulations),
+                            lambda: get_guess_risk([counts[-1 if self.players == 2 else 0] for counts in self.knowledge()]),
+                            tuple(self.deck.get_remaining()))
+
+    def candidates(self, opponent: int = -1) -> List[Tuple[int, ...]]:
+        """Return the possible fcombinations of the opponent, or of the central tiles for -1."""
+        if opponent == -1:
+            return self.board.get_central_fcombinations()
+        return self.board.get_opponent_fcombinations(opponent)
+
+    def positions(self, opponent: int = -1) -> List[Set[int]]:
+        """Return the tile possibilities per position of the opponent, or of the central tiles for -1."""
+        return cb.get_fcombination_positions(self.candidates(opponent), self.players)
+
+    def browse(self, opponent: int = -1) -> 'br.Browser':
+        """Return a browser of the candidates of the opponent, or of the central tiles for -1."""
+        return br.Browser(self.board, self.players, opponent)
+
+
+def distribute_remaining_tiles(players: int,
+                               people_fcombinations: List[Tuple[int, ...]],
+                               rng: random.Random | None = None) -> Tuple[Tuple[int, ...], List[Tuple[int, ...]]]:
+    """Distribute the remaining tiles among bots in game."""
+    bots = players - len(people_fcombinations)
+    held_ftiles, held_fives = cb.split_fives(tuple(itertools.chain(*people_fcombinations)))
+    remaining = [ftile for ftile in range(20) if ftile not in held_ftiles and ftile not in cb.FIVE_FTILES]
+    remaining += cb.FIVE_FTILES[held_fives:]
+    (rng or random).shuffle(remaining)
+
+    positions = 5 if players < 4 else 4
+    fcombs = [cb.canonical_fcombination(remaining[i:i+positions]) for i in range(0, len(remaining), positions)]
+
+    if players == 2:
+        return (fcombs[0], fcombs[:1])
+    return (fcombs[0], fcombs[1:bots+1])
+
+
+class CompanionSession:
+    """Keep track of a game between people and bots."""
+
+    def __init__(self,
+                 players: int,
+                 people_fcombinations: List[Tuple[int, ...]],
+                 rng: random.Random | None = None,
+                 time_budget: float | None = None,
+                 scoring: str = 'central',
+                 endgame: str | None = None) -> None:
+        """Deal the remaining tiles to the central tiles and the bots.
+
+        The bots rank the hints by sampling deals when given a time budget in seconds, or else with
+        one of the SCORINGS. With one of the solver OBJECTIVES, they follow the decision tree of the
+        endgame once there are few enough deals.
+        """
+        self.players = players
+        self.time_budget = time_budget
+        self.scoring = scoring
+        self.endgame = endgame
+        self.people_fcombinations = people_fcombinations
+        self.human_players = tuple(range(len(people_fcombinations)))
+        self.bot_players = tuple(range(len(self.human_players), players))
+        self.history = []  # type: List[Tuple[int, str, List[Tuple[int, int | str | Tuple[str, ...]]]]]
+        self.deck = dk.Deck()
+        self.deal(*distribute_remaining_tiles(players, people_fcombinations, rng))
+        self.journal = None  # type: jn.Journal | None
+        self.exporter = None  # type: ex.Exporter | None
+
+    def deal(self, central_fcombination: Tuple[int, ...], bot_fcombinations: List[Tuple[int, ...]]) -> None:
+        """Deal the given tiles to the central tiles and the bots, and start their boards."""
+        self.central_fcombination, self.bot_fcombinations = central_fcombination, bot_fcombinations
+        self.bot_games = self._new_bot_games()
+        self.bot_keys = [bs.get_root_key(fc, self.players) for fc in self.bot_fcombinations]
+        # Boards of the bots and their keys before every recorded move
+        self._bot_games_history = []  # type: List[Tuple[List[bd.Board], List[str]]]
+
+    def _record(self, event: Dict) -> None:
+        """Append an event to the journal of the session, if any."""
+        if self.journal is not None:
+            self.journal.record(event)
+
+    def _export(self, bot: int, simulations: List[Tuple[str, Tuple[float, float]]] | None = None) -> None:
+        """Append the board of a bot and its simulations to the export of the session, if any."""
+        if self.exporter is not None:
+            hints = sum(hint not in ENDING_MOVES for _, hint, _ in self.history)
+            self.exporter.add_board(self.get_board(bot), self.players, hints, f'bot {bot}', simulations)
+            self.exporter.flush()
+
+    def _rebuild_bot_games(self) -> None:
+        """Rebuild the boards of the bots before every recorded move from the cached states."""
+        self.bot_games = self._new_bot_games()
+        self.bot_keys = [bs.get_root_key(fc, self.players) for fc in self.bot_fcombinations]
+        self._bot_games_history = []
+        for _, hint, results in self.history:
+            self._apply_hint_to_bots(hint, results)
+
+    def _new_bot_games(self) -> List[bd.Board]:
+        """Return the boards of the bots at the beginning of the game."""
+        return [bd.Board(fc, self.players) for fc in self.bot_fcombinations]
+
+    def _apply_hint_to_bots(self,
+                            hint: str,
+                            results: List[Tuple[int, int | str | Tuple[str, ...]]]) -> None:
+        """Apply hint results to bot games, keeping the previous boards."""
+        self._bot_games_history.append((self.bot_games, self.bot_keys))
+        if hint in ENDING_MOVES:
+            return
+        bot_games, bot_keys = [], []
+        for index, board in enumerate(self.bot_games):
+            bot = self.bot_players[index]
+            other_players = [p for p in range(self.players) if p != bot]
+            board, key = bs.with_hint(board, self.bot_keys[index], hint,
+                                      [(other_players.index(player), answer) for player, answer in results if player != bot])
+            bot_games.append(board)
+            bot_keys.append(key)
+        self.bot_games, self.bot_keys = bot_games, bot_keys
+
+    def get_fcombination(self, player: int) -> Tuple[int, ...]:
+        """Return the tiles of a player."""
+        if player in self.human_players:
+            return self.people_fcombinations[self.human_players.index(player)]
+        return self.bot_fcombinations[self.bot_players.index(player)]
+
+    def get_target_fcombination(self, bot: int) -> Tuple[int, ...]:
+        """Return the tiles a bot has to guess: those of its opponent with 2 players, and the central tiles otherwise."""
+        if self.players == 2:
+            return self.get_fcombination(1 - bot)
+        return self.central_fcombination
+
+    def get_board(self, bot: int) -> bd.Board:
+        """Return the board of a bot player."""
+        return self.bot_games[self.bot_players.index(bot)]
+
+    def get_public_board(self) -> bd.Board:
+        """Return the board of the public answers of all the players."""
+        return kn.get_board(self.players, [(hint, results) for _, hint, results in self.history
+                                           if hint not in ENDING_MOVES])
+
+    def get_players_state(self) -> Tuple[Set[int], Set[int]]:
+        """Return the players out of the game and the winning players."""
+        out, win = [], []
+        for player, hint_name, results in self.history:
+            if hint_name in ENDING_MOVES:
+                out.append(player)
+                if hint_name == WINNING_MOVE:
+                    win.append(player)
+                    out.extend([p for p, r in results if r in ENDING_MOVES])
+        return set(out), set(win)
+
+    def get_answers(self, player: int, hint: str) -> List[Tuple[int, int | str | Tuple[str, ...]]]:
+        """Return the answers of the other players to a hint asked by a player."""
+        results = []
+        for opponent in self.human_players + self.bot_players:
+            if self.players == 4 or opponent != player:
+                results.append((opponent, ut.HINTS[hint]['function'](self.get_fcombination(opponent))))
+        return results
+
+    def apply_hint(self, player: int, hint: str) -> List[Tuple[int, int | str | Tuple[str, ...]]]:
+        """Ask a hint on behalf of a player, apply the answers and return them."""
+        results = self.get_answers(player, hint)
+        self._apply_hint_to_bots(hint, results)
+        self.history.append((player, hint, results))
+        self.deck.use(hint)
+        self._record({'event': 'hint', 'player': player, 'hint': hint})
+        for bot in self.bot_players:
+            self._export(bot)
+        return results
+
+    def end_game(self, player: int, move: str) -> None:
+        """Record a winning or losing move of a player."""
+        losers = []
+        if move == WINNING_MOVE:
+            out_of_the_game, _ = self.get_players_state()
+            order = [h[0] for h in self.history]
+            player_order = tuple(sorted(set(order), key=order.index))
+            for bot in self.bot_players:
+                if bot not in player_order or player not in player_order or \
+                   player_order.index(bot) >= player_order.index(player):
+                    break
+                if bot not in out_of_the_game:
+                    losers.append((bot, LOSING_MOVE))
+        self._apply_hint_to_bots(move, losers)
+        self.history.append((player, move, losers))
+        self._record({'event': 'end', 'player': player, 'move': move})
+
+    def undo(self) -> bool:
+        """Cancel the last move and return whether there was one."""
+        if len(self.history) == 0:
+            return False
+        if len(self._bot_games_history) < len(self.history):
+            # The boards before the checkpoint of a resumed game are only rebuilt when needed
+            self._rebuild_bot_games()
+        _, move, _ = self.history.pop()
+        if move not in ENDING_MOVES:
+            self.deck.unuse()
+        self.bot_games, self.bot_keys = self._bot_games_history.pop()
+        self._record({'event': 'undo'})
+        return True
+
+    def simulate(self, bot: int, hints: Tuple[str, ...]) -> List[Tuple[str, Tuple[float, float]]]:
+        """Simulate the given hints on the board of a bot and return the simulations, best first."""
+        simulations = self._simulate(bot, hints)
+        self._export(bot, simulations)
+        return simulations
+
+    def _simulate(self, bot: int, hints: Tuple[str, ...]) -> List[Tuple[str, Tuple[float, float]]]:
+        """Return the simulations of the given hints on the board of a bot, best first, leaving the dominated hints out."""
+        hints, _ = prune_hints(self.get_board(bot), hints, self.scoring)
+        if self.time_budget is not None:
+            return simulate_sampled(self.get_board(bot), hints, self.time_budget)
+        if self.scoring == 'opponents' and all(hint in ENDING_MOVES for _, hint, _ in self.history):
+            # The opening book ranks the hints of the initial board
+            opening = bk.get_simulations(self.get_fcombination(bot), self.players, hints)
+            if opening is not None:
+                return opening
+        board = self.get_board(bot)
+        knowledge = None
+        if self.scoring == 'knowledge':
+            knowledge = (self.get_public_board(), bot, self.get_fcombination(bot))
+        return sort_simulations([(hint, simulate_hint(board, hint, self.scoring, knowledge, self.deck)) for hint in hints])
+
+    def show_cards(self, cards: Tuple[str, ...]) -> None:
+        """Record the hint cards face up."""
+        self.deck.show(cards)
+        self._record({'event': 'cards', 'cards': list(cards)})
+
+    def bot_move(self, bot: int, hints: Tuple[str, ...] | None = None) -> str | None:
+        """Return the move of a bot, or None if it needs the available hints to choose one."""
+        if hints is not None:
+            self.show_cards(hints)
+        move = self._choose_bot_move(bot, hints)
+        if move is not None:
+            self._record({'event': 'bot', 'bot': bot, 'move': move})
+        return move
+
+    def _choose_bot_move(self, bot: int, hints: Tuple[str, ...] | None) -> str | None:
+        """Return the best move of a bot, or None without the available hints."""
+        board = self.get_board(bot)
+        _, winning_players = self.get_players_state()
+        counts = board.get_fcombinations_counts()
+        if counts[0] == 1:
+            return WINNING_MOVE
+        if len(winning_players) > 0 or any(count == 0 for count in counts[1:]):
+            return LOSING_MOVE
+        if hints is None or len(hints) == 0:
+            return None
+        hints, _ = prune_hints(board, hints, self.scoring)
+        guess, win, _ = decide_guess(board, hints, lambda: self.get_guess_risk(bot), tuple(self.deck.get_remaining()))
+        if guess:
+            return WINNING_MOVE if win[1] == self.get_target_fcombination(bot) else LOSING_MOVE
+        if len(hints) == 1:
+            return hints[0]
+        if self.endgame is not None:
+            # The tree is solved again on every turn, which also follows the hints of the other players
+            solution = sv.solve(board, hints, self.endgame)
+            if solution is not None and solution[1] is not None:
+                return solution[1][0]
+        return self.simulate(bot, hints)[0][0]
+
+    def get_guess_risk(self, bot: int) -> float:
+        """Return the probability that a player still in the game guesses right before the next turn of a bot."""
+        out_of_the_game, _ = self.get_players_state()
+        opponents = [player for player in range(self.players) if player != bot]
+        # The opponents guess the tiles of the bot with 2 players, and the central tiles otherwise
+        return get_guess_risk([counts[1 + bot if self.players == 2 else 0]
+                               for player, counts in zip(opponents, self.knowledge(bot))
+                               if player not in out_of_the_game])
+
+    def knowledge(self, bot: int) -> List[Tuple[int, ...]]:
+        """Return the number of central fcombinations and of fcombinations of every player, as every opponent of a bot sees them.
+
+        The counts of a player are in the order of the players, their own one being the number of
+        fcombinations that the others have for them.
+        """
+        board = self.get_board(bot)
+        public = self.get_public_board()
+        opponents = [player for player in range(self.players) if player != bot]
+        return [kn.get_view_counts(public, player, board.get_held_exclusion_mask(index))
+                for index, player in enumerate(opponents)]
+
+    def candidates(self, bot: int, opponent: int = -1) -> List[Tuple[int, ...]]:
+        """Return the possible fcombinations of an opponent of a bot, or of the central tiles for -1."""
+        board = self.get_board(bot)
+        if opponent == -1:
+            return board.get_central_fcombinations()
+        return board.get_opponent_fcombinations(opponent)
+
+    def positions(self, bot: int, opponent: int = -1) -> List[Set[int]]:
+        """Return the tile possibilities per position for a bot, or of the central tiles for -1."""
+        return cb.get_fcombination_positions(self.candidates(bot, opponent), self.players)
+
+    def browse(self, bot: int, opponent: int = -1) -> 'br.Browser':
+        """Return a browser of the candidates of an opponent of a bot, or of the central tiles for -1."""
+        return br.Browser(self.get_board(bot), self.players, opponent)
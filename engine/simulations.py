@@ -0,0 +1,43 @@
+"""Cache of hint simulations shared by the sessions and the bulk tools.
+
+A simulation only depends on the candidates of a board, on the 5 tiles left to the other players,
+on the hint and on how it is scored, so the simulations are addressed by the masks of the board,
+whose hash is the fingerprint of the board, and by a key of the 5 tiles left, the hint and its
+scoring. A board reached again, after an undo, by another bot or in
+another game, gets its simulations back without simulating anything. The simulations of the least
+recently used boards are forgotten beyond MEMORY_SIZE boards.
+"""
+
+
+from typing import Dict, Tuple
+import collections
+
+
+# Number of boards whose simulations are kept in memory
+MEMORY_SIZE = 1024
+
+_memory = collections.OrderedDict()  # type: collections.OrderedDict[Tuple[int, ...], Dict[Tuple, Tuple[float, float]]]
+
+
+def get(masks: Tuple[int, ...], key: Tuple) -> Tuple[float, float] | None:
+    """Return the simulation of a key on the board of the given masks, or None if it is not cached."""
+    simulations = _memory.get(masks)
+    if simulations is None:
+        return None
+    _memory.move_to_end(masks)
+    return simulations.get(key)
+
+
+def put(masks: Tuple[int, ...], key: Tuple, simulation: Tuple[float, float]) -> None:
+    """Cache the simulation of a key on the board of the given masks."""
+    if masks not in _memory:
+        _memory[masks] = {}
+    _memory[masks][key] = simulation
+    _memory.move_to_end(masks)
+    while len(_memory) > MEMORY_SIZE:
+        _memory.popitem(last=False)
+
+
+def clear() -> None:
+    """Forget all the simulations."""
+    _memory.clear()
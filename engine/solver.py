@@ -0,0 +1,133 @@
+"""Exact decision trees of the hints of the endgame.
+
+Once few joint deals of the central tiles and of the opponents are left, every deal weighs the
+number of deals of the tiles it stands for, and asking a hint splits them by the tuple of the
+answers of the opponents. A decision tree tells which hint to ask first and, for every tuple of
+answers, which hint to ask next, until the central tiles are known or no hint splits the deals any
+further. The solver finds a tree asking the least hints on average over the deals, or in the worst
+case.
+
+The sets of deals are bitsets over the deals, so that splitting them is a bitwise AND. Every set of
+deals is solved once, and a hint is skipped as soon as the hints it needs at least exceed those of
+the best hint so far. The hints stay available, since asking a hint again never splits the deals.
+"""
+
+
+from typing import Dict, List, Tuple
+import collections
+
+import engine.board as bd
+import engine.tables as tb
+import engine.utils as ut
+
+
+# Maximum number of joint deals of a board solved exactly
+SOLVER_LIMIT = 100
+
+OBJECTIVES = ut.OBJECTIVES
+
+# A node of a decision tree is the hint to ask, with the node of every tuple of answers, or None
+# once the central tiles are known or no hint splits the deals
+Node = Tuple[str, Dict[Tuple[int | str | Tuple[str, ...], ...], 'Node | None']]
+
+
+class Solver:
+    """Find the decision trees of the joint deals of a board with the given hints."""
+
+    def __init__(self, board: bd.Board, hints: Tuple[str, ...], objective: str = 'expected') -> None:
+        """Split the deals of the board by the answers to every hint."""
+        self.objective = objective
+        tables = tb.get_tables(len(board.get_masks()))
+        deals = board.get_central_deals() or []
+        self.deals_mask = (1 << len(deals)) - 1
+        # Deals of every central fcombination, deals weighing twice, and deals of every tuple of answers
+        # to every hint
+        central_masks = collections.defaultdict(int)  # type: Dict[int, int]
+        self._double_mask = 0
+        for position, (central_index, _, weight) in enumerate(deals):
+            central_masks[central_index] |= 1 << position
+            if weight == 2:
+                self._double_mask |= 1 << position
+        self._central_masks = [central_masks[central_index] for central_index, _, _ in deals]
+        self._answer_masks = {}  # type: Dict[str, Dict[Tuple[int | str | Tuple[str, ...], ...], int]]
+        for hint in dict.fromkeys(hints):
+            answers = tables.answers[hint]
+            masks = collections.defaultdict(int)
+            for position, (_, deal, _) in enumerate(deals):
+                masks[tuple(answers[index] for index in deal)] |= 1 << position
+            self._answer_masks[hint] = dict(masks)
+        self._solutions = {}  # type: Dict[int, Tuple[float, Node | None]]
+
+    def _weigh(self, mask: int) -> int:
+        """Return the weight of a set of deals."""
+        return tb.count(mask) + tb.count(mask & self._double_mask)
+
+    def is_solved(self, mask: int) -> bool:
+        """Return whether the central tiles are the same in every deal of a set."""
+        lowest = (mask & -mask).bit_length() - 1
+        return mask == 0 or mask & ~self._central_masks[lowest] == 0
+
+    def _is_split(self, mask: int) -> bool:
+        """Return whether a hint splits a set of deals."""
+        return any(sum(1 for answer_mask in answer_masks.values() if mask & answer_mask != 0) > 1
+                   for answer_masks in self._answer_masks.values())
+
+    def _split(self, mask: int) -> List[Tuple[str, List[Tuple[Tuple[int | str | Tuple[str, ...], ...], int]]]]:
+        """Return the hints splitting a set of deals with the sets of every tuple of answers, the most promising first."""
+        splits = []
+        for hint, answer_masks in self._answer_masks.items():
+            children = [(answers, mask & answer_mask) for answers, answer_mask in answer_masks.items()
+                        if mask & answer_mask != 0]
+            if len(children) > 1:
+                splits.append((hint, children))
+        # The smaller the sets of answers, the fewer hints are needed after the hint
+        return sorted(splits, key=lambda split: sum(self._weigh(child) ** 2 for _, child in split[1]))
+
+    def solve(self, mask: int | None = None) -> Tuple[float, Node | None]:
+        """Return the least number of hints needed to know the central tiles of a set of deals, all of them by default, with the decision tree."""
+        mask = self.deals_mask if mask is None else mask
+        if self.is_solved(mask):
+            return 0, None
+        if mask in self._solutions:
+            return self._solutions[mask]
+
+        count = self._weigh(mask)
+        best = (float('inf'), None)  # type: Tuple[float, Node | None]
+        splits = self._split(mask)
+        for hint, children in splits:
+            # Every set of answers left unsolved needs one more hint at least, unless no hint splits it
+            bounds = [0 if self.is_solved(child) or not self._is_split(child) else 1 for _, child in children]
+            if self._combine(children, bounds, count) >= best[0]:
+                continue
+            costs, nodes = list(bounds), {}
+            for position, (answers, child) in enumerate(children):
+                costs[position], nodes[answers] = self.solve(child)
+                if self._combine(children, costs, count) >= best[0]:
+                    break
+            else:
+                best = (self._combine(children, costs, count), (hint, nodes))
+        if len(splits) == 0:
+            # No hint splits the deals, so the central tiles can only be guessed
+            best = (0, None)
+        self._solutions[mask] = best
+        return best
+
+    def _combine(self, children: List[Tuple[Tuple, int]], costs: List[float], count: int) -> float:
+        """Return the number of hints of a hint followed by the given numbers of hints for every set of answers."""
+        if self.objective == 'worst':
+            return 1 + max(costs)
+        return 1 + sum(self._weigh(child) * cost for (_, child), cost in zip(children, costs)) / count
+
+
+def solve(board: bd.Board,
+          hints: Tuple[str, ...],
+          objective: str = 'expected',
+          limit: int = SOLVER_LIMIT) -> Tuple[float, Node | None] | None:
+    """Return the least number of hints needed to know the central tiles of a board, with the decision tree.
+
+    It is None if there are more than the limit of joint deals.
+    """
+    deals = board.get_central_deals()
+    if deals is None or len(deals) == 0 or len(deals) > limit:
+        return None
+    return Solver(board, hints, objective).solve()
@@ -0,0 +1,142 @@
+"""Cache of board states shared across games.
+
+A board state is addressed by a key chaining the hash of our tiles and the number of players with
+the hash of every hint and its answers, in order. The masks of the states are kept in memory with
+a least recently used policy and, when the `BREAK_THE_CODE_STATES` environment variable names a
+directory, in one file per state in that directory.
+"""
+
+
+from typing import List, Tuple
+import collections
+import hashlib
+import json
+import os
+
+import engine.board as bd
+import engine.tables as tb
+
+
+STORE_ENVIRONMENT_VARIABLE = 'BREAK_THE_CODE_STATES'
+
+# Number of board states kept in memory
+MEMORY_SIZE = 1024
+
+_memory = collections.OrderedDict()  # type: collections.OrderedDict[str, Tuple[int, ...]]
+
+
+def _hash(value: object) -> str:
+    """Return the hash of a value encoded in canonical JSON."""
+    return hashlib.sha256(json.dumps(value, separators=(',', ':')).encode()).hexdigest()
+
+
+def get_root_key(fcombination: Tuple[int, ...], players: int = 2) -> str:
+    """Return the key of the initial board of a game."""
+    return _hash(['board', tb.TABLES_VERSION, sorted(fcombination), players])
+
+
+def get_key(key: str, hint: str, answers: List[Tuple[int, int | str | Tuple[str, ...]]]) -> str:
+    """Return the key of the board state reached by applying the answers to a hint."""
+    return _hash([key, hint, sorted([opponent, answer] for opponent, answer in answers)])
+
+
+def get_store_path(key: str) -> str | None:
+    """Return the path of the file storing a state, or None without a store on disk."""
+    directory = os.environ.get(STORE_ENVIRONMENT_VARIABLE, '')
+    if directory == '':
+        return None
+    return os.path.join(directory, key[:2], key[2:])
+
+
+def get(key: str) -> Tuple[int, ...] | None:
+    """Return the masks of a state, or None if it is not cached."""
+    if key in _memory:
+        _memory.move_to_end(key)
+        return _memory[key]
+
+    path = get_store_path(key)
+    if path is None:
+        return None
+    try:
+        with open(path, 'rb') as state_file:
+            data = state_file.read()
+    except OSError:
+        return None
+    # The masks are stored with the same number of bytes, written in the first two bytes
+    width = int.from_bytes(data[:2], 'little')
+    if width == 0 or len(data) < 2 + width or (len(data) - 2) % width != 0:
+        return None
+    masks = tuple(int.from_bytes(data[i:i + width], 'little') for i in range(2, len(data), width))
+    _remember(key, masks)
+    return masks
+
+
+def put(key: str, masks: Tuple[int, ...]) -> None:
+    """Cache the masks of a state."""
+    _remember(key, masks)
+    path = get_store_path(key)
+    if path is None or os.path.exists(path):
+        return
+    width = max(1, max((mask.bit_length() + 7) // 8 for mask in masks))
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write to a temporary file first so that a partial state is never read
+        with open(path + '.tmp', 'wb') as state_file:
+            state_file.write(width.to_bytes(2, 'little') + b''.join(mask.to_bytes(width, 'little') for mask in masks))
+        os.replace(path + '.tmp', path)
+    except OSError:
+        pass
+
+
+def _remember(key: str, masks: Tuple[int, ...]) -> None:
+    """Keep the masks of a state in memory, forgetting the least recently used ones."""
+    _memory[key] = masks
+    _memory.move_to_end(key)
+    while len(_memory) > MEMORY_SIZE:
+        _memory.popitem(last=False)
+
+
+def with_hint(board: bd.Board,
+              key: str,
+              hint: str,
+              answers: List[Tuple[int, int | str | Tuple[str, ...]]]) -> Tuple[bd.Board, str]:
+    """Return the board with the answers to a hint applied and its key, reusing the cached state if any."""
+    child_key = get_key(key, hint, answers)
+    masks = get(child_key)
+    if masks is not None:
+        return board.with_masks(masks), child_key
+    child = board.with_hint(hint, answers)
+    put(child_key, child.get_masks())
+    return child, child_key
+
+
+def get_board(fcombination: Tuple[int, ...],
+              players: int,
+              history: List[Tuple[str, List[Tuple[int, int | str | Tuple[str, ...]]]]],
+              board: bd.Board | None = None) -> Tuple[bd.Board, str]:
+    """Return the board after the hints of the history and its key, starting from the deepest cached state.
+
+    The initial board is the board of our tiles unless given.
+    """
+    board = board or bd.Board(fcombination, players)
+    keys = [get_root_key(fcombination, players)]
+    for hint, answers in history:
+        keys.append(get_key(keys[-1], hint, answers))
+
+    for depth in range(len(history), 0, -1):
+        masks = get(keys[depth])
+        if masks is not None:
+            board = board.with_masks(masks)
+            break
+    else:
+        depth = 0
+
+    for hint, answers in history[depth:]:
+        board, _ = with_hint(board, keys[depth], hint, answers)
+        depth += 1
+    return board, keys[depth]
+
+
+def clear() -> None:
+    """Forget the states kept in memory."""
+    _memory.clear()
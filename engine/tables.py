@@ -0,0 +1,225 @@
+"""Prebuilt tables of hands and hint answers."""
+
+
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Tuple
+import hashlib
+import importlib
+import itertools
+import os
+import pickle
+import tempfile
+import time
+import engine.combination as cb
+import engine.utils as ut
+
+
+# Increase the version whenever the content of the tables changes
+TABLES_VERSION = 4
+
+CACHE_DIR = os.environ.get('BREAK_THE_CODE_CACHE',
+                           os.path.join(os.path.expanduser('~'), '.cache', 'break-the-code'))
+
+
+class Tables(NamedTuple):
+    """All the fcombinations of a given size and the answers of every hint to them.
+
+    A set of fcombinations is stored as a mask: an integer whose bit i is set when the i-th
+    fcombination belongs to the set. The fcombinations are canonical, so that a hand holding a
+    single 5 tile only appears once, with the first 5 ftile.
+    """
+    fcombinations: Tuple[Tuple[int, ...], ...]
+    index: Dict[Tuple[int, ...], int]
+    answers: Dict[str, Tuple[int | str | Tuple[str, ...], ...]]
+    # Mask of the fcombinations giving each answer to each hint
+    answer_masks: Dict[str, Dict[int | str | Tuple[str, ...], int]]
+    # Mask of the fcombinations holding each ftile
+    tile_masks: Tuple[int, ...]
+    # Mask of the fcombinations holding at most 0, 1 and 2 tiles of rank 5
+    fives_masks: Tuple[int, int, int]
+    universe: int
+    # Ftiles of every fcombination other than its 5 tiles, and its number of 5 tiles
+    plain_ftiles: Tuple[Tuple[int, ...], ...]
+    fives: Tuple[int, ...]
+
+
+_tables = {}  # type: Dict[int, Tables]
+_position_masks = {}  # type: Dict[int, Tuple[Tuple[int, ...], ...]]
+
+
+def get_positions(players: int = 2) -> int:
+    """Return the number of tiles in a hand for the specified number of players."""
+    return 5 if players < 4 else 4
+
+
+def get_cache_path(positions: int) -> str:
+    """Return the path of the cache file of the tables."""
+    return os.path.join(CACHE_DIR, f'tables-v{TABLES_VERSION}-{positions}.pickle')
+
+
+def indices_to_mask(indices: Iterable[int], size: int) -> int:
+    """Return the mask of the given fcombination indices."""
+    bits = bytearray(b'0' * size)
+    for index in indices:
+        bits[size - 1 - index] = 49  # ord('1')
+    return int(bits, 2) if size > 0 else 0
+
+
+def iter_indices(mask: int) -> Iterator[int]:
+    """Yield the fcombination indices of a mask in ascending order."""
+    bits = bin(mask)[:1:-1]
+    index = bits.find('1')
+    while index != -1:
+        yield index
+        index = bits.find('1', index + 1)
+
+
+def get_index(mask: int, position: int) -> int:
+    """Return the index of the fcombination at the given position among the fcombinations of a mask."""
+    return next(itertools.islice(iter_indices(mask), position, None))
+
+
+def count(mask: int) -> int:
+    """Return the number of fcombinations of a mask."""
+    return mask.bit_count()
+
+
+def build_tables(positions: int) -> Tables:
+    """Enumerate all the fcombinations and compute the answers of every hint."""
+    fcombinations = tuple(f for f in itertools.combinations(range(20), positions) if cb.is_canonical(f))
+    size = len(fcombinations)
+    index = {f: i for i, f in enumerate(fcombinations)}
+    answers = {hint: tuple(map(ut.HINTS[hint]['function'], fcombinations)) for hint in ut.HINTS}
+    answer_masks = {}
+    for hint, hint_answers in answers.items():
+        indices = {}
+        for i, answer in enumerate(hint_answers):
+            indices.setdefault(answer, []).append(i)
+        answer_masks[hint] = {answer: indices_to_mask(answer_indices, size)
+                              for answer, answer_indices in indices.items()}
+    tile_masks = tuple(indices_to_mask((i for i, f in enumerate(fcombinations) if ftile in f), size)
+                       for ftile in range(20))
+    universe = (1 << size) - 1
+    # A hand holding a 5 tile holds the first 5 ftile, and the second one when it holds both
+    fives_masks = (universe & ~tile_masks[10], universe & ~tile_masks[11], universe)
+    split = [cb.split_fives(f) for f in fcombinations]
+    return Tables(fcombinations, index, answers, answer_masks, tile_masks, fives_masks, universe,
+                  tuple(ftiles for ftiles, _ in split), tuple(fives for _, fives in split))
+
+
+def _checksum(payload: bytes) -> str:
+    """Return the checksum of a serialized payload."""
+    return hashlib.sha256(payload).hexdigest()
+
+
+def load_tables(positions: int) -> Tables | None:
+    """Load the tables from the cache file, or return None if it is missing, outdated or corrupted."""
+    try:
+        with open(get_cache_path(positions), 'rb') as cache_file:
+            header, payload = pickle.load(cache_file)
+        if header != {'version': TABLES_VERSION,
+                      'positions': positions,
+                      'hints': list(ut.HINTS),
+                      'checksum': _checksum(payload)}:
+            return None
+        fields = pickle.loads(payload)
+        fcombinations = fields[0]
+    except (OSError, pickle.UnpicklingError, EOFError, ValueError, TypeError, IndexError):
+        return None
+    # The index is faster to rebuild than to load
+    return Tables(fcombinations, {f: i for i, f in enumerate(fcombinations)}, *fields[1:])
+
+
+def save_tables(tables: Tables, positions: int) -> bool:
+    """Save the tables to the cache file and return whether it succeeded."""
+    fields = tuple(field for name, field in tables._asdict().items() if name != 'index')
+    payload = pickle.dumps(fields, protocol=pickle.HIGHEST_PROTOCOL)
+    header = {'version': TABLES_VERSION,
+              'positions': positions,
+              'hints': list(ut.HINTS),
+              'checksum': _checksum(payload)}
+    path = get_cache_path(positions)
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        # Write to a temporary file first so that a partial file is never loaded
+        with open(path + '.tmp', 'wb') as cache_file:
+            pickle.dump((header, payload), cache_file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(path + '.tmp', path)
+    except OSError:
+        return False
+    return True
+
+
+def get_tables(players: int = 2) -> Tables:
+    """Return the tables for the specified number of players, building them on first use."""
+    positions = get_positions(players)
+    if positions not in _tables:
+        tables = load_tables(positions)
+        if tables is None:
+            tables = build_tables(positions)
+            save_tables(tables, positions)
+        _tables[positions] = tables
+    return _tables[positions]
+
+
+def get_position_masks(players: int = 2) -> Tuple[Tuple[int, ...], ...]:
+    """Return the mask of the fcombinations holding each ftile at each position, building them on first use."""
+    positions = get_positions(players)
+    if positions not in _position_masks:
+        fcombinations = get_tables(players).fcombinations
+        indices = [[[] for _ in range(20)] for _ in range(positions)]
+        for i, fcombination in enumerate(fcombinations):
+            for position, ftile in enumerate(fcombination):
+                indices[position][ftile].append(i)
+        _position_masks[positions] = tuple(tuple(indices_to_mask(ftile_indices, len(fcombinations))
+                                                 for ftile_indices in position_indices)
+                                           for position_indices in indices)
+    return _position_masks[positions]
+
+
+def clear_tables() -> None:
+    """Forget the tables loaded in memory."""
+    _tables.clear()
+    _position_masks.clear()
+
+
+def profile_startup(players: int = 2) -> List[Tuple[str, float]]:
+    """Return the time in seconds of each startup step, building the tables cold then loading them warm.
+
+    The tables are saved to a temporary cache directory, which leaves the cache of the user as it is.
+    """
+    global CACHE_DIR
+    timings = []
+    positions = get_positions(players)
+
+    start = time.perf_counter()
+    bd = importlib.import_module('engine.board')
+    timings.append(('Import the engine', time.perf_counter() - start))
+
+    cache_dir = CACHE_DIR
+    with tempfile.TemporaryDirectory() as directory:
+        CACHE_DIR = directory
+        try:
+            start = time.perf_counter()
+            tables = build_tables(positions)
+            timings.append(('Build tables (cold)', time.perf_counter() - start))
+
+            start = time.perf_counter()
+            save_tables(tables, positions)
+            timings.append(('Save tables to the cache', time.perf_counter() - start))
+
+            start = time.perf_counter()
+            tables = load_tables(positions)
+            timings.append(('Load tables from the cache (warm)', time.perf_counter() - start))
+        finally:
+            CACHE_DIR = cache_dir
+    if tables is not None:
+        _tables[positions] = tables
+
+    start = time.perf_counter()
+    bd.Board(tuple(range(positions)), players)
+    timings.append(('First board', time.perf_counter() - start))
+
+    start = time.perf_counter()
+    bd.Board(tuple(range(positions)), players)
+    timings.append(('Next board', time.perf_counter() - start))
+    return timings
@@ -1,6 +1,9 @@
 """Utilities and constants."""
 
 
+import importlib.util
+import sys
+import types
 import engine.hint as ht
 
 
@@ -84,3 +87,25 @@ WHITE_COLOR = '\x1b[0;37;44m'
 GREEN_COLOR = '\x1b[0;31;44m'
 
 END_COLOR = '\x1b[0m'
+
+# Exact rankings of the hints: by the answers of every opponent alone, of all the opponents together,
+# of every opponent alone counting the central fcombinations they filter too, the latter minus what
+# the answers teach the opponents, or by the answers of every opponent alone to the hint and to the
+# best card face up next
+SCORINGS = ('opponents', 'joint', 'central', 'knowledge', 'deck')
+
+# Number of hints minimised by the endgame solver: on average over the deals, or in the worst case
+OBJECTIVES = ('expected', 'worst')
+
+
+def lazy_import(name: str) -> types.ModuleType:
+    """Return a module that is only executed the first time one of its attributes is used."""
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
@@ -11,69 +11,105 @@ of the tile (e.g., "2b" would be "5").
 """
 
 
-from typing import List, Tuple
+import argparse
 import sys
 
-import engine.board as bd
 import engine.combination as cb
 import engine.menu as mn
+import engine.utils as ut
 
+# The engine is only loaded when the first board is needed
+pf = ut.lazy_import('engine.profiling')
+ex = ut.lazy_import('engine.export')
+jn = ut.lazy_import('engine.journal')
+ss = ut.lazy_import('engine.session')
+tb = ut.lazy_import('engine.tables')
 
-players = mn.ask_number_of_players()
-fcombination = cb.combination_to_fcombination(mn.ask_user_combination(players))
-board = bd.Board(fcombination, players)
-hints = []  # type: List[Tuple[str, int]]
-simulations = []  # type: List[Tuple[str, Tuple[float, float]]]
-while True:
-    choice = mn.display_main_menu(fcombination,
-                                  board.get_central_fcombinations(),
-                                  board.get_opponents_fcombinations(),
-                                  hints,
-                                  simulations)
-    match choice:
-        case 'h':
-            hint = mn.display_hints_menu(players)
-            if hint is not None:
-                hint_name = hint[0]
-                hint_results = []
 
-                num_opponent_combs_before = [len(opponent_combs) for opponent_combs in board.get_opponents_fcombinations()]                                
-                for opponent, hint_result in hint[1]:
-                    board.apply_hint(hint_name, hint_result, opponent)
+def parse_args() -> argparse.Namespace:
+    """Parse the command line arguments."""
+    parser = argparse.ArgumentParser(description='Break the Code Helper')
+    parser.add_argument('--profile-startup', action='store_true',
+                        help='report the cold and warm startup times and exit')
+    parser.add_argument('--profile', action='store_true',
+                        help='record the time and the candidates of the board operations')
+    parser.add_argument('--sampling', type=float, metavar='SECONDS',
+                        help='rank the hints by sampling consistent deals for up to SECONDS instead of exactly')
+    parser.add_argument('--scoring', choices=ut.SCORINGS, default='opponents',
+                        help='rank the hints by the answers of every opponent alone, of all of them together, '
+                             'also counting the central tiles they filter, the latter minus what the '
+                             'opponents learn, or also counting the next card face up (default: %(default)s)')
+    parser.add_argument('--endgame', choices=ut.OBJECTIVES, default='expected',
+                        help='solve the endgame for the fewest hints on average or in the worst case (default: %(default)s)')
+    parser.add_argument('--journal', metavar='PATH',
+                        help='journal of the game (default: journal-helper.jsonl in the cache directory)')
+    parser.add_argument('--resume', action='store_true',
+                        help='resume the game of the journal')
+    parser.add_argument('--export', metavar='DIRECTORY',
+                        help='export the boards and the simulations of the game as columns to DIRECTORY')
+    return parser.parse_args()
 
-                for opponent, hint_result in hint[1]:
-                    num_opponent_combs_after = len(board.get_opponent_fcombinations(opponent))
-                    improvement = num_opponent_combs_before[opponent] - num_opponent_combs_after
-                    hint_results.append((opponent, hint_result, improvement))
 
-                hints.append((hint_name, hint_results))
-                simulations = []
-        case 's':
-            hints_to_simulate = mn.display_simulation_menu(players)
-            if hints_to_simulate is not None:
-                for hint in hints_to_simulate:
-                    if hint not in [simulation[0] for simulation in simulations]:
-                        simulations.append((hint, board.simulate(hint)))
-                simulations = sorted(simulations, key=lambda s: (round(s[1][0], 2), -s[1][1]), reverse=True)
-        case 'c':
-            opponent = mn.ask_opponent_number(players)
-            if opponent == -1:
-                mn.display_combinations_menu(board.get_central_fcombinations())
-            else: 
-                mn.display_combinations_menu(board.get_opponent_fcombinations(opponent))
-        case 'u':
-            if len(hints) > 0:
-                hints.pop()
-                simulations = []
-            board = bd.Board(fcombination, players)
-            for hint in hints:
-                hint_name = hint[0]
-                for hint_results in hint[1]:
-                    opponent, hint_result = hint_results[:2]
-                    board.apply_hint(hint_name, hint_result, opponent)
-        case 'q':
-            really = input('Really quit? Press \'y\' to quit, anything else to go back: ')
-            if really.lower() == 'y':
-                sys.exit(0)
-        case _:
-            pass
+def main() -> None:
+    """Run the helper in the terminal."""
+    args = parse_args()
+    if args.profile_startup:
+        mn.display_startup_profile(tb.profile_startup)
+        return
+    if args.profile or pf.is_requested():
+        pf.enable()
+
+    journal_path = args.journal or jn.get_journal_path('helper')
+    if args.resume:
+        session = jn.resume(journal_path)
+        players, fcombination = session.players, session.fcombination
+    else:
+        players = mn.ask_number_of_players()
+        fcombination = cb.combination_to_fcombination(mn.ask_user_combination(players))
+        session = ss.HelperSession(fcombination, players, args.sampling, args.scoring, args.endgame)
+        session.journal = jn.Journal(journal_path, session)
+    if args.export:
+        session.exporter = ex.Exporter(args.export)
+    while True:
+        solution = session.solve()
+        choice = mn.display_main_menu(fcombination,
+                                      session.board.get_central_fcombinations(),
+                                      session.board.get_opponents_fcombinations(),
+                                      session.hints,
+                                      session.simulations,
+                                      session.knowledge(),
+                                      session.guess(),
+                                      session.deck.get_counts(),
+                                      session.dominated,
+                                      None if solution is None else (session.endgame, *solution))
+        match choice:
+            case 'h':
+                hint = mn.display_hints_menu(players, session.board.get_answer_counts)
+                if hint is not None:
+                    session.apply_hint(*hint)
+                    conflict = session.find_conflict()
+                    if len(conflict) > 0:
+                        index = mn.display_conflict_menu(session.hints, conflict, players)
+                        if index is not None:
+                            session.remove_hint(index)
+            case 's':
+                hints_to_simulate = mn.display_simulation_menu(players)
+                if hints_to_simulate is not None:
+                    session.simulate(hints_to_simulate)
+            case 'c':
+                opponent = mn.ask_opponent_number(players)
+                mn.display_combinations_menu(session.browse(opponent))
+            case 'u':
+                session.undo()
+            case 'p':
+                mn.display_profiling_menu(pf.is_enabled(), pf.get_stats(), pf.export_json)
+            case 'q':
+                really = input('Really quit? Press \'y\' to quit, anything else to go back: ')
+                if really.lower() == 'y':
+                    sys.exit(0)
+            case _:
+                pass
+
+
+if __name__ == '__main__':
+    main()
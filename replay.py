@@ -0,0 +1,55 @@
+"""Break the Code Replay.
+
+Replay recorded games (see engine/replay.py for the format) and compare the hints played with the
+hints recommended by the simulation:
+
+    python replay.py games.jsonl --workers 4 --output replays.jsonl --export replays
+"""
+
+
+import argparse
+import os
+import sys
+
+import engine.export as ex
+import engine.replay as rp
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse the command line arguments."""
+    parser = argparse.ArgumentParser(description='Break the Code Replay')
+    parser.add_argument('records', help='JSON lines file of game records, or - for the standard input')
+    parser.add_argument('-w', '--workers', type=int, default=os.cpu_count() or 1,
+                        help='number of worker processes (default: number of CPUs)')
+    parser.add_argument('-o', '--output', help='JSON lines file receiving the replay of every game')
+    parser.add_argument('-e', '--export', metavar='DIRECTORY',
+                        help='export the boards and the simulations of every move as columns to DIRECTORY')
+    return parser.parse_args()
+
+
+def main() -> None:
+    """Replay the game records."""
+    args = parse_args()
+    records_file = sys.stdin if args.records == '-' else open(args.records, encoding='utf-8')
+    output = open(args.output, 'w', encoding='utf-8') if args.output else None
+    exporter = ex.Exporter(args.export) if args.export else None
+    try:
+        replays = rp.replay(rp.read_records(records_file), args.workers, export=exporter is not None)
+        if exporter is not None:
+            replays = rp.export_replays(replays, exporter)
+        summary = rp.summarize(replays, output)
+    finally:
+        if exporter is not None:
+            exporter.close()
+        if records_file is not sys.stdin:
+            records_file.close()
+        if output is not None:
+            output.close()
+
+    print(f'Games: {summary["games"]}, moves: {summary["moves"]}, our moves: {summary["our_moves"]}')
+    print(f'Recommended hint played: {summary["agreement"]:.1%}')
+    print(f'Average rank of the hint played: {summary["average_rank"]:.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+"""Tests of the boards against a brute force over the tiles."""
+
+
+from typing import List, Tuple
+import collections
+import itertools
+import random
+import unittest
+
+import engine.board as bd
+import engine.combination as cb
+import engine.utils as ut
+
+
+def answer(hint: str, tiles: Tuple[int, ...]) -> int | str | Tuple[str, ...]:
+    """Return the answer of a hand of tiles to a hint."""
+    return ut.HINTS[hint]['function'](cb.canonical_fcombination(tiles))
+
+
+def deal_game(seed: int, players: int, hints: int) -> Tuple[bd.Board, List[Tuple[int, ...]], List[Tuple[str, List]]]:
+    """Deal a game and apply random hints, returning the board, the hands and the hints with their answers."""
+    rng = random.Random(seed)
+    tiles = list(range(20))
+    rng.shuffle(tiles)
+    size = 5 if players < 4 else 4
+    hands = [cb.canonical_fcombination(tiles[i*size:(i+1)*size]) for i in range(players + (0 if players == 2 else 1))]
+    board = bd.Board(hands[0], players)
+    history = []
+    for hint in rng.sample(list(ut.HINTS), hints):
+        answers = [(opponent, answer(hint, hands[1 + opponent])) for opponent in range(players - 1)]
+        board = board.with_hint(hint, answers)
+        history.append((hint, answers))
+    return board, hands, history
+
+
+def iter_labeled_deals(hands: List[Tuple[int, ...]],
+                       history: List[Tuple[str, List]],
+                       players: int) -> List[Tuple[Tuple[int, ...], ...]]:
+    """Return every deal of the tiles to the opponents, the two 5 tiles being different tiles, consistent with the hints."""
+    size = len(hands[0])
+    rest = [tile for tile in range(20) if tile not in hands[0]]
+
+    def is_consistent(opponent: int, tiles: Tuple[int, ...]) -> bool:
+        return all(answer(hint, tiles) == value for hint, answers in history
+                   for other, value in answers if other == opponent)
+
+    deals = [()]
+    for opponent in range(players - 1):
+        deals = [deal + (tiles,) for deal in deals
+                 for tiles in itertools.combinations([tile for tile in rest if all(tile not in hand for hand in deal)], size)
+                 if is_consistent(opponent, tiles)]
+    return deals
+
+
+class LabeledDealsTest(unittest.TestCase):
+    """Count the deals as the deals of the tiles, in which the two 5 tiles are different."""
+
+    def test_central_weights(self) -> None:
+        for seed in range(9):
+            players = 2 + seed % 2
+            board, hands, history = deal_game(seed, players, 4)
+            expected = collections.Counter()
+            for deal in iter_labeled_deals(hands, history, players):
+                held = set(hands[0]).union(*deal)
+                central = deal[0] if players == 2 else tuple(tile for tile in range(20) if tile not in held)
+                expected[cb.canonical_fcombination(central)] += 1
+            weights = {board._tables.fcombinations[index]: weight for index, weight in board.get_central_weights().items()}
+            self.assertEqual(weights, dict(expected))
+            self.assertAlmostEqual(board.get_win_probability()[0], max(expected.values()) / sum(expected.values()))
+
+    def test_joint_answers(self) -> None:
+        for seed in range(1, 12, 2):
+            board, hands, history = deal_game(seed, 3, 3)
+            hint = random.Random(seed).choice([hint for hint in ut.HINTS if hint not in dict(history)])
+            expected = collections.Counter(tuple(answer(hint, tiles) for tiles in deal)
+                                           for deal in iter_labeled_deals(hands, history, 3))
+            self.assertEqual(dict(board.count_joint_answers(hint)), dict(expected))
+
+
+class PropagationTest(unittest.TestCase):
+    """Keep every hand of the deals consistent with the hints while propagating the answers."""
+
+    def test_no_consistent_hand_pruned(self) -> None:
+        for players, seed in itertools.product((2, 3, 4), range(6)):
+            with self.subTest(players=players, seed=seed):
+                board, hands, history = deal_game(seed, players, 4)
+                masks = board.get_masks()
+                index = board._tables.index
+                deals = iter_labeled_deals(hands, history, players)
+                self.assertIn(tuple(hands[1:players]), [tuple(map(cb.canonical_fcombination, deal)) for deal in deals])
+                for deal in deals:
+                    for opponent, tiles in enumerate(deal):
+                        self.assertTrue(masks[1 + opponent] >> index[cb.canonical_fcombination(tiles)] & 1)
+                    if players > 2:
+                        held = set(hands[0]).union(*deal)
+                        central = cb.canonical_fcombination(tuple(tile for tile in range(20) if tile not in held))
+                        self.assertTrue(masks[0] >> index[central] & 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
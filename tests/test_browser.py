@@ -0,0 +1,40 @@
+"""Tests of the queries of the browser against the tiles of the candidates."""
+
+
+from typing import List
+import unittest
+
+import engine.browser as br
+import engine.tables as tb
+import engine.utils as ut
+
+
+def names(players: int, mask: int) -> List[List[str]]:
+    """Return the tile names of the fcombinations of a mask."""
+    fcombinations = tb.get_tables(players).fcombinations
+    return [[ut.TILES[ftile] for ftile in fcombinations[index]] for index in tb.iter_indices(mask)]
+
+
+class QueryTest(unittest.TestCase):
+    """Filter the fcombinations by queries."""
+
+    def test_number_at_position(self) -> None:
+        matching = names(2, br.get_query_mask('b=7'))
+        self.assertGreater(len(matching), 0)
+        self.assertTrue(all(tiles[1] in ('7b', '7w') for tiles in matching))
+        self.assertEqual(br.get_query_mask('b=7'), br.get_query_mask('b=7b') | br.get_query_mask('b=7w'))
+
+    def test_without_number(self) -> None:
+        matching = names(2, br.get_query_mask('-7'))
+        self.assertGreater(len(matching), 0)
+        self.assertTrue(all('7b' not in tiles and '7w' not in tiles for tiles in matching))
+        self.assertEqual(br.get_query_mask('-7'), br.get_query_mask('-7b -7w'))
+        self.assertEqual(br.get_query_mask('-5'), br.get_query_mask('-5g'))
+
+    def test_unknown_tile(self) -> None:
+        with self.assertRaises(ValueError):
+            br.get_query_mask('b=7g')
+
+
+if __name__ == '__main__':
+    unittest.main()
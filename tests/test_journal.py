@@ -0,0 +1,70 @@
+"""Tests of resuming the games of a journal."""
+
+
+from typing import Tuple
+import os
+import random
+import tempfile
+import unittest
+
+import engine.combination as cb
+import engine.journal as jn
+import engine.session as ss
+import engine.utils as ut
+
+
+def get_state(session: ss.HelperSession | ss.CompanionSession) -> Tuple:
+    """Return the history and the masks of the boards of a session."""
+    if isinstance(session, ss.HelperSession):
+        return session.hints, session.public_history, session.board.get_masks(), session.deck.used
+    return session.history, [board.get_masks() for board in session.bot_games], session.bot_keys, session.deck.used
+
+
+class ResumeTest(unittest.TestCase):
+    """Resume a game cut by a crash, then undo its hints."""
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'journal.jsonl')
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def resume_and_undo(self, session: ss.HelperSession | ss.CompanionSession, undos: int) -> None:
+        """Cut the last line of the journal of a session, resume it and undo hints past its checkpoint."""
+        session.journal.close()
+        session.journal = None
+        with open(self.path, 'a', encoding='utf-8') as journal_file:
+            journal_file.write('{"event":"hint","hint":"s')
+        resumed = jn.resume(self.path)
+        self.addCleanup(resumed.journal.close)
+        self.assertEqual(get_state(resumed), get_state(session))
+        for _ in range(undos):
+            self.assertEqual(resumed.undo(), session.undo())
+            self.assertEqual(get_state(resumed), get_state(session))
+
+    def test_helper(self) -> None:
+        rng = random.Random(7)
+        tiles = list(range(20))
+        rng.shuffle(tiles)
+        hands = [cb.canonical_fcombination(tiles[i:i+5]) for i in range(0, 15, 5)]
+        session = ss.HelperSession(hands[0], players=3)
+        session.journal = jn.Journal(self.path, session)
+        hints = rng.sample(list(ut.HINTS), 10)
+        session.show_cards(tuple(hints[:6]))
+        for hint in hints:
+            session.apply_hint(hint, [(opponent, ut.HINTS[hint]['function'](hand)) for opponent, hand in enumerate(hands[1:])])
+        self.resume_and_undo(session, 6)
+
+    def test_companion(self) -> None:
+        rng = random.Random(11)
+        human = cb.canonical_fcombination(rng.sample(range(20), 5))
+        session = ss.CompanionSession(3, [human], rng=rng)
+        session.journal = jn.Journal(self.path, session)
+        for turn, hint in enumerate(rng.sample(list(ut.HINTS), 10)):
+            session.apply_hint(turn % 3, hint)
+        self.resume_and_undo(session, 6)
+
+
+if __name__ == '__main__':
+    unittest.main()
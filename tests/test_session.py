@@ -0,0 +1,106 @@
+"""Tests of the game sessions."""
+
+
+import random
+import unittest
+
+import engine.board as bd
+import engine.combination as cb
+import engine.deck as dk
+import engine.session as ss
+import engine.simulations as sm
+import engine.utils as ut
+
+
+def play_bot(session: ss.CompanionSession, bot: int, seed: int, face_up: int = 3, human: int | None = None) -> str:
+    """Let a bot, after a human asking the first card if any, ask hints from a shuffled deck until it makes an ending move."""
+    hints = list(ut.HINTS)
+    random.Random(seed).shuffle(hints)
+    cards, deck = hints[:face_up], hints[face_up:]
+    players = (bot,) if human is None else (human, bot)
+    for _ in range(len(ut.HINTS)):
+        for player in players:
+            move = cards[0] if player == human else session.bot_move(bot, tuple(cards))
+            if move in ss.ENDING_MOVES:
+                return move
+            session.apply_hint(player, move)
+            cards.remove(move)
+            if len(deck) > 0:
+                cards.append(deck.pop())
+    return move
+
+
+class CompanionSessionTest(unittest.TestCase):
+    """Play games with bots."""
+
+    def test_two_players_bot_guesses_the_human_tiles(self) -> None:
+        # The bots of these games guess before only one combination is left
+        for seed in (31, 42, 80):
+            human = cb.canonical_fcombination(random.Random(seed).sample(range(20), 5))
+            session = ss.CompanionSession(2, [human], rng=random.Random(seed))
+            bot = session.bot_players[0]
+            move = play_bot(session, bot, seed, human=0)
+            board = session.get_board(bot)
+            self.assertGreater(len(board.get_central_fcombinations()), 1)
+            self.assertEqual(board.get_win_probability()[1], human)
+            self.assertEqual(move, ss.WINNING_MOVE)
+
+    def test_bot_waits_for_an_informative_hint(self) -> None:
+        # The cards face up once tell nothing more about 16 combinations as likely, but the later ones do
+        seed = 14
+        human = cb.canonical_fcombination(random.Random(seed).sample(range(20), 5))
+        session = ss.CompanionSession(2, [human], rng=random.Random(seed))
+        bot = session.bot_players[0]
+        self.assertEqual(play_bot(session, bot, seed, face_up=6), ss.WINNING_MOVE)
+        self.assertEqual(session.get_board(bot).get_central_fcombinations(), [human])
+
+    def test_no_guess_without_informative_hint(self) -> None:
+        board = bd.Board(cb.combination_to_fcombination(('0b', '1b', '2b', '3b', '4b'))).with_hint('st', [(0, 33)])
+        probability, _ = board.get_win_probability()
+        self.assertLess(probability, ss.GUESS_FLOOR)
+        # Asking the sum again or about the C tile tells nothing more, which does not make guessing worth it
+        self.assertEqual([board.get_hint_win_probability(hint) for hint in ('st', 'c')], [probability, probability])
+        self.assertFalse(ss.decide_guess(board, ('st', 'c'))[0])
+        self.assertFalse(ss.decide_guess(board, ('st', 'c'), later=('sb', 'nc'))[0])
+
+
+class SimulationsCacheTest(unittest.TestCase):
+    """Share the simulations of the boards of the same candidates."""
+
+    def test_boards_with_another_number_of_fives(self) -> None:
+        board = bd.Board(cb.combination_to_fcombination(('0b', '1b', '2b', '3b', '4b')), 3).with_hint('st', [(0, 33), (1, 20)])
+        # The same candidates, but one 5 tile is ours, so the opponents cannot both hold one
+        other = bd.Board(cb.combination_to_fcombination(('0w', '1w', '2w', '3w', '5g')), 3).with_masks(board.get_masks())
+        sm.clear()
+        ss.simulate_hint(board, 'sb', 'central')
+        self.assertEqual(ss.simulate_hint(other, 'sb', 'central'), ss._simulate_hint(other, 'sb', 'central'))
+
+
+class HelperSessionTest(unittest.TestCase):
+    """Keep track of the hints of a game."""
+
+    def test_remove_hint_then_undo(self) -> None:
+        session = ss.HelperSession(cb.combination_to_fcombination(('1b', '2w', '5g', '7b', '9w')), players=3)
+        session.apply_hint('st', [(0, 20), (1, 22)])
+        first = session.simulate(('sb', 'tb', 'nc'))
+        session.apply_hint('sb', [(0, 40), (1, 40)])
+        session.simulate(('sw', 'te'))
+        session.apply_hint('sw', [(0, 10), (1, 12)])
+        session.simulate(('sl',))
+        self.assertTrue(session.remove_hint(1))
+        self.assertEqual([hint for hint, _ in session.hints], ['st', 'sw'])
+        self.assertTrue(session.undo())
+        self.assertEqual(session.simulations, first)
+
+    def test_simulate_shows_the_given_cards(self) -> None:
+        session = ss.HelperSession(cb.combination_to_fcombination(('1b', '2w', '5g', '7b', '9w')), players=3)
+        session.simulate(('st', 'sb', 'sw'))
+        session.simulate(('tb', 'nc'))
+        self.assertEqual(session.deck.face_up, ['tb', 'nc'])
+        self.assertEqual(len(session.deck.get_remaining()), len(ut.HINTS) - 5)
+        session.simulate(('st', 'sb', 'sw', 'sl', 'sr', 'sc', 'te'))
+        self.assertEqual(len(session.deck.face_up), dk.FACE_UP)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+"""Tests of the decision trees of the endgame against an exhaustive search."""
+
+
+from typing import List, Tuple
+import collections
+import random
+import unittest
+
+import engine.solver as sv
+import engine.tables as tb
+import engine.utils as ut
+from tests.test_board import deal_game
+
+Deals = List[Tuple[int, List[int], int]]
+
+
+def split(deals: Deals, hint: str, players: int) -> List[Deals]:
+    """Return the deals of every tuple of answers to a hint."""
+    answers = tb.get_tables(players).answers[hint]
+    children = collections.defaultdict(list)
+    for central_index, deal, weight in deals:
+        children[tuple(answers[index] for index in deal)].append((central_index, deal, weight))
+    return list(children.values())
+
+
+def combine(deals: Deals, children: List[Deals], costs: List[float], objective: str) -> float:
+    """Return the number of hints of a hint followed by the given numbers of hints for every tuple of answers."""
+    if objective == 'worst':
+        return 1 + max(costs)
+    weight = sum(weight for _, _, weight in deals)
+    return 1 + sum(sum(w for _, _, w in child) * cost for child, cost in zip(children, costs)) / weight
+
+
+def search(deals: Deals, hints: Tuple[str, ...], objective: str, players: int) -> float:
+    """Return the least number of hints needed to know the central tiles, trying every hint at every node."""
+    if len({central_index for central_index, _, _ in deals}) == 1:
+        return 0
+    best = None
+    for hint in hints:
+        children = split(deals, hint, players)
+        if len(children) > 1:
+            cost = combine(deals, children, [search(child, hints, objective, players) for child in children], objective)
+            best = cost if best is None else min(best, cost)
+    return 0 if best is None else best
+
+
+def evaluate(deals: Deals, node: sv.Node | None, objective: str, players: int) -> float:
+    """Return the number of hints that a decision tree asks."""
+    if node is None:
+        return 0
+    hint, nodes = node
+    answers = tb.get_tables(players).answers[hint]
+    children = split(deals, hint, players)
+    costs = [evaluate(child, nodes[tuple(answers[index] for index in child[0][1])], objective, players)
+             for child in children]
+    return combine(deals, children, costs, objective)
+
+
+class SolverTest(unittest.TestCase):
+    """Solve the endgames of small boards."""
+
+    def test_optimal_trees(self) -> None:
+        for players, seed, hints in ((2, 0, 4), (2, 1, 3), (2, 9, 4), (3, 0, 4), (3, 10, 3), (3, 18, 4)):
+            board, _, history = deal_game(seed, players, hints)
+            deals = board.get_central_deals()
+            self.assertLess(len(deals), 20)
+            left = tuple(random.Random(seed).sample([hint for hint in ut.HINTS if hint not in dict(history)], 6))
+            for objective in ut.OBJECTIVES:
+                with self.subTest(players=players, seed=seed, objective=objective):
+                    cost, node = sv.solve(board, left, objective)
+                    self.assertAlmostEqual(cost, search(deals, left, objective, players))
+                    self.assertAlmostEqual(evaluate(deals, node, objective, players), cost)
+
+
+if __name__ == '__main__':
+    unittest.main()